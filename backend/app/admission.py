@@ -0,0 +1,197 @@
+import asyncio
+import math
+import os
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Optional
+
+from fastapi.responses import JSONResponse
+
+from app.metrics import Counter, Gauge, Histogram, registry, timed
+
+admission_queue_depth = registry.register(Gauge(
+    "admission_queue_depth", "Requests waiting for a slot, by route class.",
+    ("route_class",),
+))
+admission_in_flight = registry.register(Gauge(
+    "admission_in_flight", "Requests being handled, by route class.",
+    ("route_class",),
+))
+admission_rejections = registry.register(Counter(
+    "admission_rejections_total", "Requests shed by admission control, by route class and reason.",
+    ("route_class", "reason"),
+))
+admission_wait = registry.register(Histogram(
+    "admission_wait_seconds", "Time requests spent queued for a slot, by route class.",
+    ("route_class",),
+))
+
+# Paths that can touch many rows or run the classifier over many texts.
+BULK_ROUTES = {
+    ("GET", "/api/tasks"),
+    ("GET", "/api/tasks/search"),
+    ("GET", "/api/tasks/export"),
+    ("POST", "/api/classify"),
+    ("POST", "/api/tasks/bulk"),
+    ("PATCH", "/api/tasks/bulk"),
+    ("DELETE", "/api/tasks"),
+}
+
+
+def route_class(method: str, path: str) -> Optional[str]:
+    """Admission class of a request, or None if it is never held back.
+
+    Only API routes are limited; health checks, metrics and docs always
+    get through.
+    """
+    path = path.rstrip("/") or "/"
+    if not path.startswith("/api/"):
+        return None
+    if (method, path) in BULK_ROUTES:
+        return "bulk"
+    if method in ("GET", "HEAD"):
+        return "read"
+    return "write"
+
+
+@dataclass
+class RouteClass:
+    name: str
+    priority: int
+    limit: int
+    max_queue: int
+    queue_timeout: float
+    reject_status: int = 503
+
+
+class AdmissionController:
+    """Concurrency limits per route class with a bounded priority queue.
+
+    At most ``max_concurrency`` requests run at once, and no class runs
+    more than its own ``limit``. A request that cannot start waits in its
+    class's queue for up to ``queue_timeout`` seconds. When a slot frees
+    up, the waiting class with the lowest ``priority`` number goes first.
+    A request is rejected straight away if its queue is full.
+    """
+
+    def __init__(self, classes: Dict[str, RouteClass], max_concurrency: int):
+        self.classes = classes
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self._in_flight: Dict[str, int] = {name: 0 for name in classes}
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {name: deque() for name in classes}
+        self._by_priority = sorted(classes.values(), key=lambda route: route.priority)
+
+    def queue_depth(self, name: str) -> int:
+        return len(self._waiters[name])
+
+    def _can_start(self, name: str) -> bool:
+        return (
+            self.in_flight < self.max_concurrency
+            and self._in_flight[name] < self.classes[name].limit
+        )
+
+    def _start(self, name: str) -> None:
+        self.in_flight += 1
+        self._in_flight[name] += 1
+        admission_in_flight.set(name, value=self._in_flight[name])
+
+    def _update_depth(self, name: str) -> None:
+        admission_queue_depth.set(name, value=len(self._waiters[name]))
+
+    async def acquire(self, name: str) -> Optional[str]:
+        """Take a slot for a request. Returns None, or why it was rejected."""
+        route = self.classes[name]
+        waiters = self._waiters[name]
+
+        if not waiters and self._can_start(name):
+            self._start(name)
+            return None
+        if len(waiters) >= route.max_queue:
+            admission_rejections.inc(name, "queue_full")
+            return "queue_full"
+
+        future = asyncio.get_running_loop().create_future()
+        waiters.append(future)
+        self._update_depth(name)
+        try:
+            with timed(admission_wait, name):
+                await asyncio.wait_for(future, route.queue_timeout)
+        except asyncio.TimeoutError:
+            admission_rejections.inc(name, "timeout")
+            return "timeout"
+        except asyncio.CancelledError:
+            # The client went away; hand back a slot granted meanwhile.
+            if future.done() and not future.cancelled():
+                self.release(name)
+            raise
+        finally:
+            if future in waiters:
+                waiters.remove(future)
+            self._update_depth(name)
+        return None
+
+    def release(self, name: str) -> None:
+        self.in_flight -= 1
+        self._in_flight[name] -= 1
+        admission_in_flight.set(name, value=self._in_flight[name])
+        self._wake()
+
+    def _wake(self) -> None:
+        # The slot is counted as taken here, before the waiter resumes, so
+        # a request arriving in between cannot take it first.
+        for route in self._by_priority:
+            waiters = self._waiters[route.name]
+            while waiters and self._can_start(route.name):
+                future = waiters.popleft()
+                if future.done():
+                    continue
+                self._start(route.name)
+                future.set_result(None)
+            self._update_depth(route.name)
+
+    def retry_after(self, name: str) -> int:
+        return max(1, math.ceil(self.classes[name].queue_timeout))
+
+
+def build_admission_controller() -> AdmissionController:
+    max_concurrency = int(os.getenv("ADMISSION_MAX_CONCURRENCY", 64))
+    max_queue = int(os.getenv("ADMISSION_QUEUE_SIZE", 100))
+    queue_timeout = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", 1.0))
+    # Writes may use every slot and wait longest; bulk requests are capped at
+    # half the slots, give up soonest and are told to back off with 429.
+    classes = [
+        RouteClass("write", 0, max_concurrency, max_queue, queue_timeout * 2),
+        RouteClass("read", 1, max_concurrency, max_queue, queue_timeout),
+        RouteClass("bulk", 2, max(1, max_concurrency // 2), max_queue // 2, queue_timeout / 2, 429),
+    ]
+    return AdmissionController({route.name: route for route in classes}, max_concurrency)
+
+
+class AdmissionMiddleware:
+    """Sheds API requests with 503 or 429 and Retry-After when saturated."""
+
+    def __init__(self, app, controller: Optional[AdmissionController] = None):
+        self.app = app
+        self.controller = controller or build_admission_controller()
+
+    async def __call__(self, scope, receive, send):
+        name = route_class(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        reason = await self.controller.acquire(name)
+        if reason is not None:
+            response = JSONResponse(
+                {"detail": "Server is busy, please retry later"},
+                status_code=self.controller.classes[name].reject_status,
+                headers={"Retry-After": str(self.controller.retry_after(name))},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(name)
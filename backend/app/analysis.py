@@ -0,0 +1,230 @@
+import asyncio
+import copy
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from app.cache import LocalCacheBackend
+from app.classification import classify_task, classify_tasks
+from app.entity_extraction import extract_entities
+from app.metrics import Counter, registry, stage_duration, timed
+
+# Texts longer than this are analysed in a worker process so a huge
+# description cannot block the event loop; shorter ones run inline.
+OFFLOAD_MIN_CHARS = int(os.getenv("ANALYSIS_OFFLOAD_CHARS", 20000))
+ANALYSIS_TIME_BUDGET = float(os.getenv("ANALYSIS_TIME_BUDGET", 2.0))
+
+analysis_runs = registry.register(Counter(
+    "task_analysis_runs_total", "Uncached task analyses by where they ran and whether they finished.",
+    ("mode", "outcome"),
+))
+
+analysis_executor: Optional[ProcessPoolExecutor] = None
+
+
+class AnalysisCache:
+    """Bounded memo of classification and extraction results.
+
+    Keyed by a hash of the whitespace-normalised title and description, so
+    tasks created from the same template are analysed once.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.backend = LocalCacheBackend(max_entries=max_entries, ttl=float("inf"))
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def get(self, key: str):
+        result = self.backend.get(key)
+        with self._stats_lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return result
+
+    def set(self, key: str, result: Dict) -> None:
+        self.backend.set(key, result)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": self.backend.size(),
+            "evictions": self.backend.evictions,
+        }
+
+
+analysis_cache = AnalysisCache(int(os.getenv("ANALYSIS_CACHE_SIZE", 4096)))
+
+
+def normalise_text(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _cache_key(title: str, description: str) -> str:
+    return hashlib.sha1(f"{title}\x1f{description}".encode()).hexdigest()
+
+
+def _analyze(title: str, description: str, deadline: Optional[float] = None) -> Dict:
+    with timed(stage_duration, "classification"):
+        result = classify_task(title, description)
+    with timed(stage_duration, "entity_extraction"):
+        result["entities"] = extract_entities(title, description, deadline)
+    return result
+
+
+def _store(key: str, result: Dict, mode: str) -> None:
+    # Partial entities depend on how busy the server was, so they are
+    # returned but never cached.
+    if result["entities"].get("partial"):
+        analysis_runs.inc(mode, "partial")
+    else:
+        analysis_runs.inc(mode, "complete")
+        analysis_cache.set(key, copy.deepcopy(result))
+
+
+def analyze_task(title: str, description: str) -> Tuple[Dict, bool]:
+    """Classify a task and extract its entities.
+
+    Returns the combined result and whether it came from the cache. The
+    result is a copy the caller may modify.
+    """
+    title = normalise_text(title)
+    description = normalise_text(description)
+    key = _cache_key(title, description)
+
+    cached = analysis_cache.get(key)
+    if cached is not None:
+        return copy.deepcopy(cached), True
+
+    result = _analyze(title, description)
+    _store(key, result, "inline")
+    return result, False
+
+
+def analyze_tasks(tasks: List[Tuple[str, str]]) -> List[Tuple[Dict, bool]]:
+    """``analyze_task`` for many tasks, classifying the uncached ones at once.
+
+    Repeats within the batch are analysed once and served from the cache.
+    """
+    normalised = [(normalise_text(title), normalise_text(description)) for title, description in tasks]
+    results: List[Optional[Tuple[Dict, bool]]] = [None] * len(tasks)
+    misses: Dict[str, List[int]] = {}
+
+    for index, pair in enumerate(normalised):
+        key = _cache_key(*pair)
+        if key in misses:
+            misses[key].append(index)
+            continue
+        cached = analysis_cache.get(key)
+        if cached is not None:
+            results[index] = (copy.deepcopy(cached), True)
+        else:
+            misses[key] = [index]
+
+    if misses:
+        with timed(stage_duration, "classification"):
+            classified = classify_tasks([normalised[indexes[0]] for indexes in misses.values()])
+        for (key, indexes), result in zip(misses.items(), classified):
+            title, description = normalised[indexes[0]]
+            with timed(stage_duration, "entity_extraction"):
+                result["entities"] = extract_entities(title, description)
+            _store(key, result, "inline")
+            results[indexes[0]] = (result, False)
+            for index in indexes[1:]:
+                cached = analysis_cache.get(key)
+                results[index] = (copy.deepcopy(cached if cached is not None else result), cached is not None)
+    return results
+
+
+async def analyze_tasks_async(tasks: List[Tuple[str, str]]) -> List[Tuple[Dict, bool]]:
+    """``analyze_tasks`` without blocking the event loop.
+
+    The batch runs on a worker thread, so a few thousand short texts do not
+    stall other requests. Large texts go to worker processes alongside it,
+    each with its own time budget.
+    """
+    large = [
+        index for index, (title, description) in enumerate(tasks)
+        if len(title) + len(description) >= OFFLOAD_MIN_CHARS
+    ]
+    offloaded = set(large)
+    small = [index for index in range(len(tasks)) if index not in offloaded]
+
+    async def analyze_small() -> List[Tuple[Dict, bool]]:
+        if not small:
+            return []
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, analyze_tasks, [tasks[index] for index in small])
+
+    batch_results, *large_results = await asyncio.gather(
+        analyze_small(), *(analyze_task_async(*tasks[index]) for index in large)
+    )
+
+    results: List[Optional[Tuple[Dict, bool]]] = [None] * len(tasks)
+    for index, result in zip(small, batch_results):
+        results[index] = result
+    for index, result in zip(large, large_results):
+        results[index] = result
+    return results
+
+
+async def analyze_task_async(title: str, description: str) -> Tuple[Dict, bool]:
+    """Like ``analyze_task``, but large texts run in a worker process.
+
+    The worker gets ``ANALYSIS_TIME_BUDGET`` seconds from the time of the
+    call, including any wait for a free worker. Entities not found by then
+    are left out and marked ``"partial": True``.
+    """
+    if len(title) + len(description) < OFFLOAD_MIN_CHARS:
+        return analyze_task(title, description)
+
+    title = normalise_text(title)
+    description = normalise_text(description)
+    key = _cache_key(title, description)
+
+    cached = analysis_cache.get(key)
+    if cached is not None:
+        return copy.deepcopy(cached), True
+
+    deadline = time.time() + ANALYSIS_TIME_BUDGET
+    loop = asyncio.get_running_loop()
+    with timed(stage_duration, "offloaded_analysis"):
+        result = await loop.run_in_executor(
+            get_analysis_executor(), _analyze, title, description, deadline
+        )
+    _store(key, result, "offloaded")
+    return result, False
+
+
+def get_analysis_executor() -> ProcessPoolExecutor:
+    global analysis_executor
+
+    if analysis_executor is None:
+        max_workers = int(os.getenv("ANALYSIS_MAX_WORKERS", min(4, os.cpu_count() or 1)))
+        # Not forked: the server already runs storage threads and holds
+        # locks (metrics, caches, SQLite), and a forked child can inherit
+        # one held forever. Workers start from a clean interpreter instead.
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        analysis_executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
+    return analysis_executor
+
+
+def close_analysis_executor() -> None:
+    global analysis_executor
+
+    if analysis_executor is not None:
+        analysis_executor.shutdown(wait=True, cancel_futures=True)
+        analysis_executor = None
@@ -0,0 +1,245 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from itertools import product
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class LocalCacheBackend:
+    """In-process LRU cache with a per-entry TTL.
+
+    Version counters live outside the LRU so that evicting one can never
+    make an older cached list page reachable again.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.evictions = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def get_counter(self, key: str) -> int:
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def size(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCacheBackend:
+    """Cache shared between workers, stored in Redis as JSON."""
+
+    def __init__(self, url: str, ttl: float = 30.0, prefix: str = "task-scheduler:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise ValueError(
+                "CACHE_BACKEND=redis requires the 'redis' package. "
+                "Install it with: pip install redis"
+            ) from e
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any) -> None:
+        self.client.set(self.prefix + key, json.dumps(value), px=int(self.ttl * 1000))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def get_counter(self, key: str) -> int:
+        raw = self.client.get(self.prefix + key)
+        return int(raw) if raw is not None else 0
+
+    def incr(self, key: str) -> int:
+        return self.client.incr(self.prefix + key)
+
+    def size(self) -> int:
+        return self.client.dbsize()
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            self.client.delete(key)
+
+
+ListFilters = Tuple[Optional[str], Optional[str], Optional[str]]
+
+# Single tasks share this many version counters, so the counters stay
+# bounded however many tasks there are.
+TASK_VERSION_STRIPES = 1024
+
+
+class TaskCache:
+    """Read-through cache for single tasks and list pages.
+
+    List pages are keyed on a version counter per (category, priority,
+    status) filter combination. A write bumps the counters of every
+    combination the affected rows appear in, which orphans exactly the
+    pages that could have changed. Single tasks are keyed the same way on
+    a counter shared by a stripe of task ids.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def _record(self, hit: bool) -> None:
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    @staticmethod
+    def _task_version_key(task_id: int) -> str:
+        return f"task-version:{task_id % TASK_VERSION_STRIPES}"
+
+    def task_key(self, task_id: int) -> str:
+        # Resolved before reading the row from storage, like list_key, so a
+        # row read before a write lands under a key nobody reads again.
+        version = self.backend.get_counter(self._task_version_key(task_id))
+        return f"task:{task_id}:{version}"
+
+    @staticmethod
+    def _version_key(filters: Optional[ListFilters]) -> str:
+        return f"version:{json.dumps(filters)}"
+
+    def list_key(self, filters: ListFilters, offset: int, limit: int, after: Optional[Tuple] = None) -> str:
+        # Resolve the key before reading the page from storage, so a write
+        # that lands during the read cannot be masked by the stale page.
+        versions = (
+            self.backend.get_counter(self._version_key(None)),
+            self.backend.get_counter(self._version_key(filters)),
+        )
+        position = f"{offset}:{limit}:{json.dumps(after)}" if after else f"{offset}:{limit}"
+        return f"list:{json.dumps(filters)}:{versions[0]}.{versions[1]}:{position}"
+
+    def counts_key(self, now: str, due_soon_before: str) -> str:
+        # Every write bumps the unfiltered list version, so counts share it.
+        unfiltered = (None, None, None)
+        versions = (
+            self.backend.get_counter(self._version_key(None)),
+            self.backend.get_counter(self._version_key(unfiltered)),
+        )
+        return f"counts:{versions[0]}.{versions[1]}:{now}:{due_soon_before}"
+
+    def get_task(self, key: str) -> Optional[Dict]:
+        task = self.backend.get(key)
+        self._record(task is not None)
+        return task
+
+    def peek_task(self, task_id: int) -> Optional[Dict]:
+        return self.backend.get(self.task_key(task_id))
+
+    def set_task(self, key: str, task: Dict) -> None:
+        self.backend.set(key, task)
+
+    def _invalidate_task(self, task_id: int) -> None:
+        key = self.task_key(task_id)
+        self.backend.incr(self._task_version_key(task_id))
+        self.backend.delete(key)
+
+    def get_list(self, key: str) -> Optional[Tuple[List[Dict], int]]:
+        page = self.backend.get(key)
+        self._record(page is not None)
+        return (page[0], page[1]) if page is not None else None
+
+    def set_list(self, key: str, tasks: List[Dict], total: int) -> None:
+        self.backend.set(key, [tasks, total])
+
+    def get_counts(self, key: str) -> Optional[List[Dict]]:
+        counts = self.backend.get(key)
+        self._record(counts is not None)
+        return counts
+
+    def set_counts(self, key: str, counts: List[Dict]) -> None:
+        self.backend.set(key, counts)
+
+    def invalidate_tasks(self, tasks: Iterable[Dict]) -> None:
+        combinations = set()
+        for task in tasks:
+            self._invalidate_task(task["id"])
+            combinations.update(product(
+                (task.get("category"), None),
+                (task.get("priority"), None),
+                (task.get("status"), None),
+            ))
+        for filters in combinations:
+            self.backend.incr(self._version_key(filters))
+
+    def invalidate_task_id(self, task_id: int) -> None:
+        self.invalidate_task_ids([task_id])
+
+    def invalidate_task_ids(self, task_ids: Iterable[int]) -> None:
+        # Without the old rows we cannot tell which lists held them.
+        for task_id in task_ids:
+            self._invalidate_task(task_id)
+        self.backend.incr(self._version_key(None))
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": self.backend.size(),
+            "evictions": self.backend.evictions,
+        }
+
+
+def build_cache() -> Optional[TaskCache]:
+    backend = os.getenv("CACHE_BACKEND", "local").lower()
+    ttl = float(os.getenv("CACHE_TTL_SECONDS", 30))
+
+    if backend == "none":
+        return None
+    if backend == "local":
+        return TaskCache(LocalCacheBackend(int(os.getenv("CACHE_MAX_ENTRIES", 1024)), ttl))
+    if backend == "redis":
+        return TaskCache(RedisCacheBackend(os.getenv("REDIS_URL", "redis://localhost:6379/0"), ttl))
+    raise ValueError(f"Unknown CACHE_BACKEND '{backend}'. Expected 'local', 'redis' or 'none'.")
@@ -1,4 +1,6 @@
-from typing import Dict, List
+import os
+import re
+from typing import Dict, List, Set, Tuple
 
 CATEGORY_KEYWORDS = {
     "scheduling": [
@@ -72,42 +74,148 @@ SUGGESTED_ACTIONS = {
     ]
 }
 
-def classify_category(text: str) -> str:
+def _trie_pattern(keywords: List[str]) -> str:
+    # Nest the keywords into a trie-shaped regex so each text position walks a
+    # single branch per character, regardless of how many keywords there are.
+    trie: Dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if "" in node else group
+
+    return build(trie)
+
+def _compile_keywords():
+    keywords = sorted(
+        {keyword for table in (CATEGORY_KEYWORDS, PRIORITY_KEYWORDS)
+         for words in table.values() for keyword in words}
+    )
+
+    # The scanner reports the longest keyword at each position it tries and
+    # skips over what it matched. Any keyword it stepped over is either
+    # contained in that match or straddles its end; both are resolved from
+    # these tables so the result equals a substring check per keyword.
+    contained = {
+        keyword: frozenset(other for other in keywords if other in keyword)
+        for keyword in keywords
+    }
+    # Index proper prefixes so each keyword looks up its own suffixes
+    # instead of testing every other keyword; this runs at import time.
+    by_prefix: Dict[str, Set[str]] = {}
+    for other in keywords:
+        for i in range(1, len(other)):
+            by_prefix.setdefault(other[:i], set()).add(other)
+    straddling = {
+        keyword: frozenset(
+            other
+            for i in range(len(keyword))
+            for other in by_prefix.get(keyword[i:], ())
+            if other not in contained[keyword]
+        )
+        for keyword in keywords
+    }
+    return re.compile(_trie_pattern(keywords)), contained, straddling
+
+_KEYWORD_SCANNER, _CONTAINED_KEYWORDS, _STRADDLING_KEYWORDS = _compile_keywords()
+
+_CATEGORY_KEYWORD_SETS = {
+    category: frozenset(keywords)
+    for category, keywords in CATEGORY_KEYWORDS.items()
+    if category != "general"
+}
+_PRIORITY_KEYWORD_SETS = {
+    priority: frozenset(keywords)
+    for priority, keywords in PRIORITY_KEYWORDS.items()
+}
+
+def _find_keywords(text: str) -> Set[str]:
     text_lower = text.lower()
-    category_scores = {}
+    matches = set(_KEYWORD_SCANNER.findall(text_lower))
+    if not matches:
+        return set()
     
-    for category, keywords in CATEGORY_KEYWORDS.items():
-        if category == "general":
-            continue
-        score = sum(1 for keyword in keywords if keyword in text_lower)
-        if score > 0:
-            category_scores[category] = score
+    found = set().union(*[_CONTAINED_KEYWORDS[match] for match in matches])
+    candidates = set().union(*[_STRADDLING_KEYWORDS[match] for match in matches])
+    found.update(keyword for keyword in candidates - found if keyword in text_lower)
+    return found
+
+def _category_from_keywords(found: Set[str]) -> str:
+    best_category = "general"
+    best_score = 0
     
-    if category_scores:
-        return max(category_scores, key=category_scores.get)
-    return "general"
+    for category, keywords in _CATEGORY_KEYWORD_SETS.items():
+        score = len(found & keywords)
+        if score > best_score:
+            best_category, best_score = category, score
+    return best_category
+
+def _priority_from_keywords(found: Set[str]) -> str:
+    if found & _PRIORITY_KEYWORD_SETS["high"]:
+        return "high"
+    if found & _PRIORITY_KEYWORD_SETS["low"]:
+        return "low"
+    return "medium"
+
+def classify_category(text: str) -> str:
+    return _category_from_keywords(_find_keywords(text))
 
 def classify_priority(text: str) -> str:
-    text_lower = text.lower()
-    
-    for keyword in PRIORITY_KEYWORDS["high"]:
-        if keyword in text_lower:
-            return "high"
+    return _priority_from_keywords(_find_keywords(text))
+
+class KeywordEngine:
+    def classify(self, texts: List[str]) -> List[Tuple[str, str]]:
+        results = []
+        for text in texts:
+            found = _find_keywords(text)
+            results.append((_category_from_keywords(found), _priority_from_keywords(found)))
+        return results
+
+_engine = None
+
+def get_engine():
+    """The classifier picked by ``CLASSIFIER_ENGINE``, built on first use.
+
+    ``keyword`` (the default) is the keyword tally above; ``learned`` loads
+    the model at ``CLASSIFIER_MODEL_PATH`` (see ``app.learned_classifier``).
+    """
+    global _engine
     
-    for keyword in PRIORITY_KEYWORDS["low"]:
-        if keyword in text_lower:
-            return "low"
-            
-    return "medium"
+    if _engine is None:
+        name = os.getenv("CLASSIFIER_ENGINE", "keyword").lower()
+        if name == "keyword":
+            _engine = KeywordEngine()
+        elif name == "learned":
+            from app.learned_classifier import LearnedEngine
+            _engine = LearnedEngine.load(os.getenv("CLASSIFIER_MODEL_PATH", "classifier.npy"))
+        else:
+            raise ValueError(f"Unknown CLASSIFIER_ENGINE '{name}'. Expected 'keyword' or 'learned'.")
+    return _engine
+
+def set_engine(engine) -> None:
+    global _engine
+    _engine = engine
+
+def classify_tasks(tasks: List[Tuple[str, str]]) -> List[Dict]:
+    """Classify ``(title, description)`` pairs in one engine call."""
+    labels = get_engine().classify([f"{title} {description}" for title, description in tasks])
+    return [
+        {
+            "category": category,
+            "priority": priority,
+            "suggested_actions": SUGGESTED_ACTIONS.get(category, [])
+        }
+        for category, priority in labels
+    ]
 
 def classify_task(title: str, description: str) -> Dict:
-    combined_text = f"{title} {description}"
-    
-    category = classify_category(combined_text)
-    priority = classify_priority(combined_text)
-    
-    return {
-        "category": category,
-        "priority": priority,
-        "suggested_actions": SUGGESTED_ACTIONS.get(category, [])
-    }
+    return classify_tasks([(title, description)])[0]
@@ -1,14 +1,55 @@
+import asyncio
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import threading
 from pathlib import Path
-from supabase import create_client, Client
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
+from app.cache import TaskCache, build_cache
+from app.metrics import db_duration, db_errors
+from app.storage import TaskStorage, CachedStorage, SQLiteStorage, SupabaseStorage
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 env_path = Path(__file__).parent.parent / ".env"
 load_dotenv(dotenv_path=env_path)
 
-supabase: Client = None
+supabase: "Client" = None
+storage: TaskStorage = None
+cache: TaskCache = None
+db_executor: ThreadPoolExecutor = None
+_init_lock = threading.Lock()
 
 def init_db():
+    # Startup runs this on a worker thread while requests may already be
+    # arriving; the lock makes them wait for it instead of racing it.
+    with _init_lock:
+        _init_db()
+
+def _init_db():
+    global storage, cache
+    
+    backend = os.getenv("DB_BACKEND", "supabase").lower()
+    
+    if backend == "sqlite":
+        storage = SQLiteStorage(os.getenv("SQLITE_PATH", "tasks.db"))
+        print(f"SQLite database initialized at {storage.path}")
+    elif backend == "supabase":
+        init_supabase()
+        storage = SupabaseStorage(supabase)
+    else:
+        raise ValueError(f"Unknown DB_BACKEND '{backend}'. Expected 'supabase' or 'sqlite'.")
+    
+    cache = build_cache()
+    if cache is not None:
+        storage = CachedStorage(storage, cache)
+    
+    init_executor()
+
+def init_supabase():
     global supabase
     
     supabase_url = os.getenv("SUPABASE_URL")
@@ -38,6 +79,9 @@ def init_db():
         )
     
     try:
+        # Imported here: the client library takes longer to import than
+        # the rest of the app, and SQLite deployments never need it.
+        from supabase import create_client
         supabase = create_client(supabase_url, supabase_key)
         print("Database connection initialized")
     except Exception as e:
@@ -49,7 +93,54 @@ def init_db():
         error_msg += f"4. URL format: {supabase_url[:30]}... (should start with https://)\n"
         raise ValueError(error_msg) from e
 
-def get_db():
-    if supabase is None:
-        init_db()
-    return supabase
+def init_executor():
+    global db_executor
+    
+    if db_executor is None:
+        max_workers = int(os.getenv("DB_MAX_WORKERS", 16))
+        db_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db")
+
+def close_db():
+    global db_executor, storage, cache
+    
+    if db_executor is not None:
+        db_executor.shutdown(wait=True)
+        db_executor = None
+    
+    if storage is not None:
+        storage.close()
+        storage = None
+        cache = None
+
+def get_storage() -> TaskStorage:
+    if storage is None:
+        with _init_lock:
+            if storage is None:
+                _init_db()
+    return storage
+
+def storage_ready() -> bool:
+    return storage is not None
+
+def get_cache() -> TaskCache:
+    return cache
+
+def _timed_call(func, *args, **kwargs):
+    operation = getattr(func, "__name__", "unknown")
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    except Exception:
+        db_errors.inc(operation)
+        raise
+    finally:
+        db_duration.observe(operation, value=time.perf_counter() - start)
+
+async def run_db(func, *args, **kwargs):
+    # Storage backends are synchronous; run their round-trips on a bounded
+    # pool so a slow query never blocks the event loop. The timing is taken
+    # on the worker, so it excludes time spent queued for a thread.
+    if db_executor is None:
+        init_executor()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, partial(_timed_call, func, *args, **kwargs))
@@ -0,0 +1,256 @@
+import asyncio
+import heapq
+import inspect
+import itertools
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.metrics import Counter, Gauge, registry
+
+deadline_events = registry.register(Counter(
+    "deadline_events_total", "Deadline hooks fired, by kind.", ("kind",),
+))
+pending_deadlines = registry.register(Gauge(
+    "deadlines_pending", "Unfinished tasks with a scheduled deadline.",
+))
+
+_ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_RELATIVE_DAYS = {"today": 0, "tomorrow": 1, "next week": 7, "next month": 30}
+
+
+def normalise_due_date(value: str) -> Optional[str]:
+    """Parse a free-form due date into a naive UTC ``YYYY-MM-DDTHH:MM:SS``."""
+    from dateutil import parser as date_parser
+
+    try:
+        parsed = date_parser.parse(value)
+    except (ValueError, OverflowError):
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.isoformat(timespec="seconds")
+
+
+def resolve_due_at(due_date: Optional[str], entity_dates: Iterable[str], now: datetime) -> Optional[str]:
+    """Pick the timestamp a task is due at.
+
+    An explicit ``due_date`` wins. Otherwise the dates found in the text are
+    used: the earliest one from today on, or failing that the latest past
+    one, so an old deadline still shows up as overdue.
+    """
+    if due_date:
+        normalised = normalise_due_date(due_date)
+        if normalised:
+            return normalised
+
+    today = now.date()
+    candidates = []
+    for text in entity_dates:
+        key = text.lower()
+        if key in _RELATIVE_DAYS:
+            candidates.append(today + timedelta(days=_RELATIVE_DAYS[key]))
+        elif _ISO_DATE.match(text):
+            try:
+                candidates.append(datetime.strptime(text, "%Y-%m-%d").date())
+            except ValueError:
+                continue
+    if not candidates:
+        return None
+
+    upcoming = [day for day in candidates if day >= today]
+    chosen = min(upcoming) if upcoming else max(candidates)
+    return f"{chosen.isoformat()}T00:00:00"
+
+
+def _timestamp(due_at: str) -> float:
+    parsed = datetime.fromisoformat(due_at)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+Hook = Callable[[int, str], object]
+
+
+class DeadlineScheduler:
+    """Fires reminder and escalation hooks for upcoming task deadlines.
+
+    Deadlines live in a min-heap of ``(fire_at, kind, task_id, generation)``
+    entries, loaded once at startup and kept current by the task routes.
+    A single background task sleeps until the earliest entry is due, so
+    nothing polls the table. Every scheduling gets a new generation.
+    Rescheduling or cancelling leaves the old heap entries in place; they
+    are skipped when popped because their generation is no longer the one
+    in ``_deadlines``, even if the task was moved back to the same time.
+    """
+
+    def __init__(self, reminder_lead: float = 3600.0):
+        self.reminder_lead = reminder_lead
+        self.hooks: Dict[str, List[Hook]] = {"reminder": [], "escalation": []}
+        self._heap: List[Tuple[float, str, int, int]] = []
+        # task_id -> (generation, due_at) of its live deadline
+        self._deadlines: Dict[int, Tuple[int, str]] = {}
+        self._generations = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        # Tasks scheduled or cancelled since start(restoring=True).
+        self._touched: Optional[Set[int]] = None
+
+    def add_hook(self, kind: str, hook: Hook) -> None:
+        self.hooks[kind].append(hook)
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def _is_live(self, entry: Tuple[float, str, int, int]) -> bool:
+        live = self._deadlines.get(entry[2])
+        return live is not None and live[0] == entry[3]
+
+    def _entries(self, task_id: int, due_at: str, now: float) -> List[Tuple[float, str, int, int]]:
+        # Events already in the past are not fired: a task created overdue,
+        # or one that fell due while the process was down, is not escalated
+        # again on every restart.
+        due = _timestamp(due_at)
+        if due <= now:
+            self._deadlines.pop(task_id, None)
+            return []
+
+        generation = next(self._generations)
+        self._deadlines[task_id] = (generation, due_at)
+        entries = [(due, "escalation", task_id, generation)]
+        if self.reminder_lead > 0 and due - self.reminder_lead > now:
+            entries.append((due - self.reminder_lead, "reminder", task_id, generation))
+        return entries
+
+    def schedule(self, task_id: int, due_at: Optional[str]) -> None:
+        if self._touched is not None:
+            self._touched.add(task_id)
+        if not due_at:
+            self.cancel(task_id)
+            return
+        live = self._deadlines.get(task_id)
+        if live is not None and live[1] == due_at:
+            return
+
+        if len(self._heap) > 4 * len(self._deadlines) + 1024:
+            self._compact()
+        earliest = self._heap[0][0] if self._heap else None
+        for entry in self._entries(task_id, due_at, datetime.now(timezone.utc).timestamp()):
+            heapq.heappush(self._heap, entry)
+        pending_deadlines.set(value=len(self._deadlines))
+
+        if self._wakeup is not None and self._heap and (earliest is None or self._heap[0][0] < earliest):
+            self._wakeup.set()
+
+    def schedule_many(self, deadlines: Iterable[Tuple[int, str]]) -> None:
+        now = datetime.now(timezone.utc).timestamp()
+        for task_id, due_at in deadlines:
+            if due_at:
+                self._heap.extend(self._entries(task_id, due_at, now))
+        heapq.heapify(self._heap)
+        pending_deadlines.set(value=len(self._deadlines))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _compact(self) -> None:
+        self._heap = [entry for entry in self._heap if self._is_live(entry)]
+        heapq.heapify(self._heap)
+
+    def cancel(self, task_id: int) -> None:
+        if self._touched is not None:
+            self._touched.add(task_id)
+        if self._deadlines.pop(task_id, None) is not None:
+            pending_deadlines.set(value=len(self._deadlines))
+
+    def cancel_many(self, task_ids: Iterable[int]) -> None:
+        for task_id in task_ids:
+            if self._touched is not None:
+                self._touched.add(task_id)
+            self._deadlines.pop(task_id, None)
+        pending_deadlines.set(value=len(self._deadlines))
+
+    def pop_due(self, now: float) -> List[Tuple[str, int, str]]:
+        """Remove and return the live events whose time has come."""
+        fired = []
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            if not self._is_live(entry):
+                continue
+            _, kind, task_id, _ = entry
+            fired.append((kind, task_id, self._deadlines[task_id][1]))
+            if kind == "escalation":
+                del self._deadlines[task_id]
+        if fired:
+            pending_deadlines.set(value=len(self._deadlines))
+        return fired
+
+    def start(self, deadlines: Iterable[Tuple[int, str]] = (), restoring: bool = False) -> None:
+        """Start firing hooks.
+
+        With ``restoring``, the stored deadlines are handed over later
+        through ``restore``, and the routes may schedule tasks meanwhile.
+        """
+        if self._task is not None:
+            return
+        self._heap.clear()
+        self._deadlines.clear()
+        self.schedule_many(deadlines)
+        self._touched = set() if restoring else None
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    def restore(self, deadlines: Iterable[Tuple[int, str]]) -> None:
+        """Schedule the deadlines loaded from storage after ``start(restoring=True)``.
+
+        Tasks scheduled or cancelled since the start keep that newer state
+        rather than what was loaded.
+        """
+        touched, self._touched = self._touched or set(), None
+        self.schedule_many(
+            (task_id, due_at) for task_id, due_at in deadlines if task_id not in touched
+        )
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._wakeup = None
+        self._touched = None
+
+    async def _run(self) -> None:
+        while True:
+            # Drop stale entries first so they do not cut the sleep short.
+            while self._heap and not self._is_live(self._heap[0]):
+                heapq.heappop(self._heap)
+
+            timeout = None
+            if self._heap:
+                timeout = max(0.0, self._heap[0][0] - datetime.now(timezone.utc).timestamp())
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+            for kind, task_id, due_at in self.pop_due(datetime.now(timezone.utc).timestamp()):
+                await self._fire(kind, task_id, due_at)
+
+    async def _fire(self, kind: str, task_id: int, due_at: str) -> None:
+        deadline_events.inc(kind)
+        for hook in self.hooks[kind]:
+            try:
+                result = hook(task_id, due_at)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                print(f"Deadline {kind} hook failed for task {task_id}: {str(e)}")
+
+
+deadline_scheduler = DeadlineScheduler(float(os.getenv("REMINDER_LEAD_SECONDS", 3600)))
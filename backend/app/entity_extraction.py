@@ -1,16 +1,40 @@
 import re
-from typing import Dict, List
-from dateutil import parser as date_parser
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Set
 
+# Patterns are tried left to right at each position, so the four-digit-year
+# form must come before the form that would match its last eight characters.
 DATE_PATTERNS = [
-    r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}',
     r'\d{4}[/-]\d{1,2}[/-]\d{1,2}',
+    r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}',
     r'(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{1,2},?\s+\d{4}',
     r'\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{4}',
     r'today|tomorrow|yesterday|next week|next month',
     r'\d{1,2}:\d{2}\s*(?:AM|PM|am|pm)?',
 ]
 
+# Indexes into DATE_PATTERNS of the absolute calendar dates, which are
+# normalised to YYYY-MM-DD; relative words and times are kept as written.
+_ABSOLUTE_DATE_PATTERNS = {0, 1, 2, 3}
+
+_DATE_REGEX = re.compile(
+    "|".join(f"({pattern})" for pattern in DATE_PATTERNS), re.IGNORECASE
+)
+
+MAX_DATE_PARSES = 20
+
+# With a deadline, long texts are scanned in chunks of about this many
+# characters so the scan can stop between chunks. Chunks end on whitespace
+# (or are cut hard where there is none, as in pasted base64), and each one
+# is matched with a little of the next so that a phrase starting near its
+# end is still found whole.
+ENTITY_CHUNK_CHARS = 65536
+_CHUNK_LOOKAHEAD = 64
+_WHITESPACE = re.compile(r"\s")
+_DEFAULT_DATE = datetime(2000, 1, 1)
+
 PERSON_KEYWORDS = [
     r'with\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)',
     r'by\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)',
@@ -19,47 +43,99 @@ PERSON_KEYWORDS = [
     r'meet\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)',
 ]
 
-def extract_dates(text: str) -> List[str]:
-    dates = []
-    
-    for pattern in DATE_PATTERNS:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        dates.extend(matches)
+@lru_cache(maxsize=1024)
+def _normalise_date(date_text: str) -> Optional[str]:
+    # dateutil is imported on first use, off the import path at startup.
+    from dateutil import parser as date_parser
+
+    try:
+        return date_parser.parse(date_text, default=_DEFAULT_DATE).strftime('%Y-%m-%d')
+    except (ValueError, OverflowError):
+        return None
+
+def _find_dates(text: str, stop: int) -> Set[str]:
+    dates = set()
+    parses = 0
     
-    words = text.split()
-    for i, word in enumerate(words):
-        if any(char.isdigit() for char in word):
-            context = ' '.join(words[max(0, i-2):i+3])
-            try:
-                parsed = date_parser.parse(context, fuzzy=True)
-                date_str = parsed.strftime('%Y-%m-%d')
-                if date_str not in dates:
-                    dates.append(date_str)
-            except:
-                pass
+    for match in _DATE_REGEX.finditer(text):
+        if match.start() >= stop:
+            break
+        date_text = match.group(0).strip()
+        dates.add(date_text)
+        
+        if match.lastindex - 1 in _ABSOLUTE_DATE_PATTERNS and parses < MAX_DATE_PARSES:
+            parses += 1
+            normalised = _normalise_date(" ".join(date_text.lower().replace(",", " ").split()))
+            if normalised:
+                dates.add(normalised)
     
-    return list(set(dates))
+    return dates
 
-def extract_people(text: str) -> List[str]:
+def extract_dates(text: str) -> List[str]:
+    return sorted(_find_dates(text, len(text)))
+
+def _find_people(text: str, stop: int) -> List[str]:
     people = []
     
     for pattern in PERSON_KEYWORDS:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        for match in matches:
-            if isinstance(match, tuple):
-                match = match[0] if match else ""
+        for found in re.finditer(pattern, text, re.IGNORECASE):
+            if found.start() >= stop:
+                break
+            match = found.group(1)
             if match and match not in people:
                 if match[0].isupper() and len(match) > 1:
                     people.append(match.strip())
     
     return people
 
-def extract_entities(title: str, description: str) -> Dict:
+def extract_people(text: str) -> List[str]:
+    return _find_people(text, len(text))
+
+def _chunks(text: str):
+    # Yields (chunk, stop): matches must start before `stop`; the rest of
+    # the chunk is lookahead and its matches belong to the next chunk.
+    start = 0
+    while start < len(text):
+        end = start + ENTITY_CHUNK_CHARS
+        if end >= len(text):
+            end = len(text)
+        else:
+            space = _WHITESPACE.search(text, end, end + _CHUNK_LOOKAHEAD)
+            if space is not None:
+                end = space.start()
+        yield text[start:end + _CHUNK_LOOKAHEAD], end - start
+        start = end
+
+def extract_entities(title: str, description: str, deadline: Optional[float] = None) -> Dict:
+    """Extract dates and people from a task.
+
+    ``deadline`` is a ``time.time()`` value. If it passes before the whole
+    text is scanned, the entities found so far are returned with
+    ``"partial": True``.
+    """
     combined_text = f"{title} {description}"
-    dates = extract_dates(combined_text)
-    people = extract_people(combined_text)
+    if deadline is None or len(combined_text) <= ENTITY_CHUNK_CHARS:
+        return {
+            "dates": extract_dates(combined_text),
+            "people": extract_people(combined_text)
+        }
+    
+    dates = set()
+    people = []
+    seen_people = set()
+    partial = False
+    
+    for chunk, stop in _chunks(combined_text):
+        if time.time() >= deadline:
+            partial = True
+            break
+        dates.update(_find_dates(chunk, stop))
+        for person in _find_people(chunk, stop):
+            if person not in seen_people:
+                seen_people.add(person)
+                people.append(person)
     
-    return {
-        "dates": dates,
-        "people": people
-    }
+    entities = {"dates": sorted(dates), "people": people}
+    if partial:
+        entities["partial"] = True
+    return entities
@@ -0,0 +1,286 @@
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from app.database import get_storage, run_db
+from app.metrics import Counter, Gauge, registry
+
+history_entries = registry.register(Counter(
+    "task_history_entries_total", "task_history entries handled by the write-behind writer.",
+    ("outcome",),
+))
+history_queue_depth = registry.register(Gauge(
+    "task_history_queue_depth", "task_history entries waiting to be written.",
+))
+
+
+class HistoryWriter:
+    """Write-behind queue for ``task_history`` rows.
+
+    Entries are buffered in memory and inserted in batches of up to
+    ``batch_size``, at least every ``flush_interval`` seconds. A full queue
+    makes ``enqueue`` wait, which slows writers down instead of growing
+    memory. Failed batches are retried with backoff, then split so that
+    only the rows that still fail are dropped.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 500,
+        flush_interval: float = 0.5,
+        max_queue: int = 10000,
+        max_retries: int = 3,
+        retry_delay: float = 0.1,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._queue: Optional[asyncio.Queue] = None
+        self._has_entries: Optional[asyncio.Event] = None
+        self._batch_ready: Optional[asyncio.Event] = None
+        self._write_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._has_entries = asyncio.Event()
+        self._batch_ready = asyncio.Event()
+        self._write_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.flush()
+
+    async def enqueue(self, entries: List[Dict]) -> None:
+        if not entries:
+            return
+        if self._task is None:
+            # Not started (scripts, benchmarks): write through.
+            await self._write(entries)
+            return
+
+        # Wake the background task after every entry: a call with more
+        # entries than fit in the queue waits on put() until it drains.
+        for entry in entries:
+            await self._queue.put(entry)
+            history_queue_depth.set(value=self._queue.qsize())
+            self._has_entries.set()
+            if self._queue.qsize() >= self.batch_size or self._queue.full():
+                self._batch_ready.set()
+
+    async def flush(self) -> None:
+        """Write everything queued so far before returning."""
+        if self._queue is None:
+            return
+        while not self._queue.empty():
+            await self._write(self._drain(self.batch_size))
+        # Also wait out a batch the background task has in flight.
+        async with self._write_lock:
+            pass
+
+    def _drain(self, limit: int) -> List[Dict]:
+        batch = []
+        while len(batch) < limit and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        if self._queue.empty():
+            self._has_entries.clear()
+        history_queue_depth.set(value=self._queue.qsize())
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            # Entries stay in the queue until the batch is taken, so a
+            # flush() or stop() in the meantime sees all of them.
+            await self._has_entries.wait()
+            if self._queue.qsize() < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._batch_ready.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._batch_ready.clear()
+
+            batch = self._drain(self.batch_size)
+            # Shielded so a shutdown never abandons a batch halfway.
+            await asyncio.shield(self._write(batch))
+
+    async def _write(self, batch: List[Dict]) -> None:
+        if not batch:
+            return
+        lock = self._write_lock or asyncio.Lock()
+        async with lock:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    await self._insert(batch)
+                    return
+                except Exception:
+                    if attempt == self.max_retries:
+                        break
+                    await asyncio.sleep(self.retry_delay * 2 ** attempt)
+            await self._split(batch)
+
+    async def _insert(self, batch: List[Dict]) -> None:
+        await run_db(get_storage().add_history, batch)
+        history_entries.inc("written", amount=len(batch))
+
+    async def _split(self, batch: List[Dict]) -> None:
+        # A batch that keeps failing may hold a single bad row, such as an
+        # entry for a task another worker deleted. Halve it until only the
+        # failing rows are left, and drop just those.
+        middle = len(batch) // 2
+        for half in (batch[:middle], batch[middle:]):
+            if not half:
+                continue
+            try:
+                await self._insert(half)
+            except Exception as e:
+                if len(half) > 1:
+                    await self._split(half)
+                    continue
+                history_entries.inc("dropped")
+                print(f"Dropped task_history entry for task {half[0].get('task_id')}: {str(e)}")
+
+
+history_writer = HistoryWriter(
+    batch_size=int(os.getenv("HISTORY_BATCH_SIZE", 500)),
+    flush_interval=float(os.getenv("HISTORY_FLUSH_INTERVAL", 0.5)),
+    max_queue=int(os.getenv("HISTORY_QUEUE_SIZE", 10000)),
+    max_retries=int(os.getenv("HISTORY_MAX_RETRIES", 3)),
+)
+
+
+def _period_of(created_at: str, period: timedelta) -> int:
+    created = datetime.fromisoformat(created_at)
+    if created.tzinfo is not None:
+        created = created.astimezone(timezone.utc).replace(tzinfo=None)
+    return (created - datetime(1970, 1, 1)) // period
+
+
+def merge_entries(entries: List[Dict], period: timedelta) -> Tuple[List[Dict], List[int]]:
+    """Fold ``updated`` entries into one snapshot per task and period.
+
+    ``entries`` are ordered by ``(task_id, id)``. Each run of two or more
+    entries for the same task in the same period becomes its last entry,
+    with action ``snapshot`` and the changes of the whole run applied in
+    order. Returns the snapshots and the ids of the entries they replace.
+    """
+    snapshots: List[Dict] = []
+    delete_ids: List[int] = []
+    run: List[Dict] = []
+
+    def close_run():
+        if len(run) > 1:
+            changes: Dict = {}
+            for entry in run:
+                changes.update(entry.get("changes") or {})
+            snapshots.append({**run[-1], "action": "snapshot", "changes": changes})
+            delete_ids.extend(entry["id"] for entry in run[:-1])
+
+    key = None
+    for entry in entries:
+        entry_key = (entry["task_id"], _period_of(entry["created_at"], period))
+        if entry_key != key:
+            close_run()
+            run = []
+            key = entry_key
+        run.append(entry)
+    close_run()
+    return snapshots, delete_ids
+
+
+class HistoryCompactor:
+    """Background job that keeps ``task_history`` bounded per task.
+
+    Every ``interval`` seconds, ``updated`` entries older than
+    ``retention`` are merged into one snapshot per task and ``period``.
+    Newer entries, and ``created`` entries, are left as they are.
+    """
+
+    def __init__(
+        self,
+        retention: timedelta = timedelta(days=30),
+        period: timedelta = timedelta(days=1),
+        interval: float = 3600,
+        batch_size: int = 1000,
+    ):
+        self.retention = retention
+        self.period = period
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    def compact(self, now: Optional[datetime] = None) -> int:
+        """Run one pass and return how many entries were merged away.
+
+        Blocks on storage; call it through ``run_db``.
+        """
+        storage = get_storage()
+        created_before = ((now or datetime.utcnow()) - self.retention).isoformat()
+        removed = 0
+        after = None
+
+        while True:
+            entries = storage.scan_history("updated", created_before, self.batch_size, after)
+            done = len(entries) < self.batch_size
+            if not done:
+                # The last task may go on into the next page; leave it for
+                # then so its runs are merged whole.
+                last_task = entries[-1]["task_id"]
+                complete = [entry for entry in entries if entry["task_id"] != last_task]
+                entries = complete or entries
+
+            snapshots, delete_ids = merge_entries(entries, self.period)
+            if delete_ids:
+                storage.replace_history(snapshots, delete_ids)
+                removed += len(delete_ids)
+
+            if done or not entries:
+                break
+            after = (entries[-1]["task_id"], entries[-1]["id"])
+
+        history_entries.inc("compacted", amount=removed)
+        return removed
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await run_db(self.compact)
+            except Exception as e:
+                print(f"task_history compaction failed: {str(e)}")
+
+
+history_compactor = HistoryCompactor(
+    retention=timedelta(days=float(os.getenv("HISTORY_RETENTION_DAYS", 30))),
+    period=timedelta(hours=float(os.getenv("HISTORY_SNAPSHOT_HOURS", 24))),
+    interval=float(os.getenv("HISTORY_COMPACTION_INTERVAL", 3600)),
+)
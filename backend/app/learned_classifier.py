@@ -0,0 +1,209 @@
+"""Hashed bag-of-words naive Bayes classifier for category and priority.
+
+Train a model from the tasks in the configured database, then select it
+with ``CLASSIFIER_ENGINE=learned``. Run from ``backend/``::
+
+    python -m app.learned_classifier --output classifier.npy
+
+Every task is a training example labelled with its current category and
+priority. Tasks whose category or priority a user corrected by hand count
+``--correction-weight`` times as much.
+"""
+import argparse
+import re
+import sys
+import zlib
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from app.classification import CATEGORY_KEYWORDS, PRIORITY_KEYWORDS
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+CATEGORIES = list(CATEGORY_KEYWORDS)
+PRIORITIES = list(PRIORITY_KEYWORDS)
+LABELS = len(CATEGORIES) + len(PRIORITIES)
+DEFAULT_HASH_BITS = 16
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# (text, category, priority, weight)
+Example = Tuple[str, str, str, float]
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ValueError(
+            "CLASSIFIER_ENGINE=learned requires the 'numpy' package. "
+            "Install it with: pip install numpy"
+        )
+
+
+def _hash(token: str) -> int:
+    return zlib.crc32(token.encode())
+
+
+def _token_features(texts: Sequence[str], bits: int):
+    # Unigram ids, bigram ids, the text of each unigram, and which unigrams
+    # start a bigram (the next token is in the same text). Each distinct
+    # token is hashed once; bigram ids are mixed from unigram hashes.
+    token_lists = [_TOKEN.findall(text.lower()) for text in texts]
+    lengths = np.fromiter((len(tokens) for tokens in token_lists), dtype=np.int64, count=len(texts))
+    rows = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+
+    vocabulary: dict = {}
+    token_ids = np.array(
+        [vocabulary.setdefault(token, len(vocabulary)) for tokens in token_lists for token in tokens],
+        dtype=np.int64,
+    )
+    hashes = np.fromiter(map(_hash, vocabulary), dtype=np.uint64, count=len(vocabulary))[token_ids]
+
+    starts_pair = rows[1:] == rows[:-1]
+    mixed = hashes[:-1][starts_pair] * np.uint64(0x9E3779B1) + hashes[1:][starts_pair]
+    mask = np.uint64((1 << bits) - 1)
+    return (hashes & mask).astype(np.int64), (mixed & mask).astype(np.int64), rows, starts_pair
+
+
+def featurise(texts: Sequence[str], bits: int):
+    """Hashed unigram and bigram ids of every text, and the text each came from.
+
+    Together the two arrays are a sparse ``len(texts) x 2**bits`` count
+    matrix in coordinate form.
+    """
+    unigrams, bigrams, rows, starts_pair = _token_features(texts, bits)
+    return np.concatenate([unigrams, bigrams]), np.concatenate([rows, rows[:-1][starts_pair]])
+
+
+class LearnedEngine:
+    """Scores texts against a weight matrix of shape ``(2**bits + 1, LABELS)``.
+
+    Rows are per-feature log likelihoods and the last row holds the log
+    priors. Columns are ``CATEGORIES`` followed by ``PRIORITIES``.
+    """
+
+    def __init__(self, model):
+        _require_numpy()
+        features = model.shape[0] - 1
+        if model.ndim != 2 or model.shape[1] != LABELS or features < 1 or features & (features - 1):
+            raise ValueError(f"Classifier model has unexpected shape {model.shape}")
+        self.bits = features.bit_length() - 1
+        self.weights = model[:features]
+        self.bias = np.asarray(model[features], dtype=np.float32)
+
+    @classmethod
+    def load(cls, path: str) -> "LearnedEngine":
+        # Memory-mapped, so worker processes share the pages.
+        _require_numpy()
+        return cls(np.load(path, mmap_mode="r"))
+
+    def scores(self, texts: Sequence[str]):
+        # The sparse count matrix times the weights: gather the weight row
+        # of every feature, fold each bigram into its first token, and sum
+        # the rows per text.
+        unigrams, bigrams, rows, starts_pair = _token_features(texts, self.bits)
+        scores = np.zeros((len(texts), LABELS), dtype=np.float32)
+        if len(rows):
+            contributions = self.weights[unigrams]
+            contributions[:-1][starts_pair] += self.weights[bigrams]
+            present = np.unique(rows)
+            starts = np.searchsorted(rows, present)
+            scores[present] = np.add.reduceat(contributions, starts, axis=0)
+        return scores + self.bias
+
+    def classify(self, texts: Sequence[str]) -> List[Tuple[str, str]]:
+        if not texts:
+            return []
+        scores = self.scores(texts)
+        categories = scores[:, :len(CATEGORIES)].argmax(axis=1)
+        priorities = scores[:, len(CATEGORIES):].argmax(axis=1)
+        return [(CATEGORIES[c], PRIORITIES[p]) for c, p in zip(categories, priorities)]
+
+
+def train(examples: Sequence[Example], bits: int = DEFAULT_HASH_BITS, alpha: float = 1.0):
+    """Fit multinomial naive Bayes with add-``alpha`` smoothing."""
+    _require_numpy()
+    examples = [
+        example for example in examples
+        if example[1] in CATEGORIES and example[2] in PRIORITIES
+    ]
+    if not examples:
+        raise ValueError("No training examples with known categories and priorities")
+
+    features = 1 << bits
+    indices, rows = featurise([text for text, _, _, _ in examples], bits)
+    weights = np.array([weight for _, _, _, weight in examples], dtype=np.float64)
+    heads = (
+        (slice(0, len(CATEGORIES)), np.array([CATEGORIES.index(e[1]) for e in examples])),
+        (slice(len(CATEGORIES), LABELS), np.array([PRIORITIES.index(e[2]) for e in examples])),
+    )
+
+    model = np.empty((features + 1, LABELS), dtype=np.float32)
+    for columns, labels in heads:
+        classes = columns.stop - columns.start
+        counts = np.zeros((features, classes), dtype=np.float64)
+        np.add.at(counts, (indices, labels[rows]), weights[rows])
+        model[:features, columns] = np.log(counts + alpha) - np.log(counts.sum(axis=0) + alpha * features)
+        priors = np.bincount(labels, weights=weights, minlength=classes) + alpha
+        model[features, columns] = np.log(priors / priors.sum())
+    return model
+
+
+def save(model, path: str) -> None:
+    np.save(path, model)
+
+
+def _is_correction(changes: dict) -> bool:
+    # A label change without a text change came from the user; after a
+    # text edit the labels may just be the reclassification.
+    return bool(changes.keys() & {"category", "priority"}) and not changes.keys() & {"title", "description"}
+
+
+def load_examples(storage, correction_weight: float = 5.0, chunk_size: int = 1000) -> List[Example]:
+    """Training examples from every task, with corrected tasks weighted up."""
+    corrected = set()
+    for action in ("updated", "snapshot"):
+        after = None
+        while True:
+            entries = storage.scan_history(action, "9999-12-31", chunk_size, after)
+            corrected.update(
+                entry["task_id"] for entry in entries if _is_correction(entry.get("changes") or {})
+            )
+            if len(entries) < chunk_size:
+                break
+            after = (entries[-1]["task_id"], entries[-1]["id"])
+
+    examples = []
+    after = None
+    while True:
+        tasks = storage.scan_tasks(chunk_size, after)
+        examples.extend(
+            (f"{task['title']} {task['description']}", task["category"], task["priority"],
+             correction_weight if task["id"] in corrected else 1.0)
+            for task in tasks
+        )
+        if len(tasks) < chunk_size:
+            return examples
+        after = (tasks[-1]["created_at"], tasks[-1]["id"])
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="classifier.npy", help="where to write the model")
+    parser.add_argument("--bits", type=int, default=DEFAULT_HASH_BITS, help="log2 of the feature space size")
+    parser.add_argument("--correction-weight", type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    from app import database
+
+    examples = load_examples(database.get_storage(), args.correction_weight)
+    save(train(examples, args.bits), args.output)
+    corrected = sum(1 for example in examples if example[3] != 1.0)
+    print(f"Trained on {len(examples)} tasks ({corrected} corrected), wrote {args.output}", file=sys.stderr)
+    database.close_db()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
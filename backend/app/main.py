@@ -1,8 +1,18 @@
+import asyncio
+import importlib
+import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
-from app.routers import tasks
-from app.database import init_db
+from fastapi.responses import HTMLResponse, PlainTextResponse
+from app.routers import tasks, classify
+from app.database import close_db, get_cache, get_storage, run_db, storage_ready
+from app.analysis import analysis_cache, close_analysis_executor
+from app.history import history_compactor, history_writer
+from app.deadlines import deadline_scheduler
+from app.metrics import MetricsMiddleware, registry, startup_phase
+from app.admission import AdmissionMiddleware
+from app.responses import FastJSONResponse
+from app.startup import seconds_since_start
 
 app = FastAPI(
     title="Task Scheduler API",
@@ -10,9 +20,14 @@ app = FastAPI(
     version="1.0.0",
     docs_url=None,          # disable auto docs
     redoc_url=None,
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    default_response_class=FastJSONResponse
 )
 
+# Admission control, innermost so shed requests still get CORS headers
+# and are counted by the metrics middleware
+app.add_middleware(AdmissionMiddleware)
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -20,15 +35,52 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# Request counters and latency histograms
+app.add_middleware(MetricsMiddleware)
+
 # Routers
 app.include_router(tasks.router, prefix="/api/tasks", tags=["tasks"])
+app.include_router(classify.router, prefix="/api/classify", tags=["classification"])
+
+logger = logging.getLogger(__name__)
+
+startup_phase.set("app_imported", value=seconds_since_start())
+
+async def warm_up():
+    # Storage client construction, the first round-trip and the lazily
+    # imported parsers happen here, after the server is already accepting
+    # connections. A request that needs storage before then waits for it,
+    # and /health reports 503 until it is up.
+    try:
+        await run_db(get_storage)
+        startup_phase.set("storage_ready", value=seconds_since_start())
+        deadline_scheduler.restore(await run_db(get_storage().list_deadlines))
+        await asyncio.to_thread(importlib.import_module, "dateutil.parser")
+    except Exception:
+        deadline_scheduler.restore(())
+        logger.exception("Startup warm-up failed")
 
 # Startup
 @app.on_event("startup")
 async def startup_event():
-    init_db()
+    history_writer.start()
+    history_compactor.start()
+    deadline_scheduler.start(restoring=True)
+    app.state.warm_up = asyncio.create_task(warm_up())
+    startup_phase.set("serving", value=seconds_since_start())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    app.state.warm_up.cancel()
+    await asyncio.gather(app.state.warm_up, return_exceptions=True)
+    await deadline_scheduler.stop()
+    await history_compactor.stop()
+    await history_writer.stop()
+    close_analysis_executor()
+    close_db()
 
 # Root
 @app.get("/")
@@ -42,8 +94,28 @@ async def root():
 # Health check
 @app.get("/health")
 async def health():
+    # Unhealthy until storage is up. This waits out an init in progress and
+    # retries one that failed, as any storage-backed request would.
+    if not storage_ready():
+        try:
+            await run_db(get_storage)
+        except Exception as e:
+            logger.warning("Storage is not available: %s", e)
+            return FastJSONResponse({"status": "unavailable"}, status_code=503)
     return {"status": "healthy"}
 
+# Cache counters
+@app.get("/cache/stats")
+async def cache_stats():
+    cache = get_cache()
+    tasks_stats = {"enabled": True, **cache.stats()} if cache else {"enabled": False}
+    return {**tasks_stats, "analysis": analysis_cache.stats()}
+
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 # 🔥 MANUAL SWAGGER UI (GUARANTEED TO WORK)
 @app.get("/docs", include_in_schema=False)
 async def swagger_ui():
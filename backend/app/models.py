@@ -28,6 +28,7 @@ class TaskResponse(BaseModel):
     priority: str
     status: str
     due_date: Optional[str] = None
+    due_at: Optional[str] = None
     assigned_to: Optional[str] = None
     extracted_entities: Dict = Field(default_factory=dict)
     suggested_actions: List[str] = Field(default_factory=list)
@@ -37,9 +38,85 @@ class TaskResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class TaskBulkItemResult(BaseModel):
+    index: int
+    task: Optional[TaskResponse] = None
+    error: Optional[str] = None
+
+class TaskBulkResponse(BaseModel):
+    results: List[TaskBulkItemResult]
+    created: int
+    failed: int
+
+class TaskFilter(BaseModel):
+    ids: Optional[List[int]] = Field(None, min_length=1, max_length=10000)
+    category: Optional[str] = None
+    priority: Optional[str] = None
+    status: Optional[str] = None
+
+class TaskBulkChanges(BaseModel):
+    status: Optional[str] = None
+    priority: Optional[str] = None
+    assigned_to: Optional[str] = Field(None, max_length=100)
+
+class TaskBulkUpdate(BaseModel):
+    filter: TaskFilter
+    changes: TaskBulkChanges
+
+class TaskBulkMutationResponse(BaseModel):
+    affected: int
+    ids: List[int]
+
+class TaskStatsResponse(BaseModel):
+    total: int
+    by_category: Dict[str, int]
+    by_priority: Dict[str, int]
+    by_status: Dict[str, int]
+    overdue: int
+    due_soon: int
+    due_soon_days: int
+
+class ClassifyItem(BaseModel):
+    title: str = Field(..., min_length=1, max_length=200)
+    description: str = ""
+
+class ClassifyResult(BaseModel):
+    category: str
+    priority: str
+    suggested_actions: List[str]
+    entities: ExtractedEntity
+
+class ClassifyResponse(BaseModel):
+    results: List[ClassifyResult]
+    cache_hits: int
+    cache_hit_ratio: float
+
+class TaskTombstone(BaseModel):
+    id: int
+    deleted_at: str
+
+class TaskChangesResponse(BaseModel):
+    tasks: List[TaskResponse]
+    deleted: List[TaskTombstone]
+    next_since: Optional[str] = None
+    has_more: bool
+
+class TaskHistoryEntry(BaseModel):
+    id: int
+    task_id: int
+    action: str
+    changed_by: Optional[str] = None
+    changes: Dict = Field(default_factory=dict)
+    created_at: str
+
+class TaskHistoryResponse(BaseModel):
+    entries: List[TaskHistoryEntry]
+    next_cursor: Optional[str] = None
+
 class TaskListResponse(BaseModel):
     tasks: List[TaskResponse]
     total: int
     page: int
     page_size: int
     total_pages: int
+    next_cursor: Optional[str] = None
@@ -0,0 +1,62 @@
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from fastapi.responses import JSONResponse, Response
+
+from app.models import TaskResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+TASK_FIELDS = tuple(TaskResponse.model_fields)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with orjson when it is installed."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(
+            content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
+
+
+def task_payload(task: Dict) -> Dict:
+    """Shape a row from our own storage like a ``TaskResponse``, unvalidated.
+
+    Rows already passed validation on the way in, so read endpoints return
+    these directly instead of building and re-validating a model per row.
+    """
+    payload = {field: task.get(field) for field in TASK_FIELDS}
+    if payload["extracted_entities"] is None:
+        payload["extracted_entities"] = {}
+    if payload["suggested_actions"] is None:
+        payload["suggested_actions"] = []
+    return payload
+
+
+def _etag_matches(etag: str, if_none_match: str) -> bool:
+    # If-None-Match uses weak comparison: W/ prefixes are ignored.
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def conditional_response(content: Any, if_none_match: Optional[str] = None) -> Response:
+    """``FastJSONResponse`` with an ETag, or 304 if the client has it already.
+
+    The ETag is a hash of the encoded body, so it changes exactly when the
+    response would.
+    """
+    response = FastJSONResponse(content, headers={"Cache-Control": "no-cache"})
+    etag = f'"{hashlib.sha1(response.body).hexdigest()}"'
+    if if_none_match and _etag_matches(etag, if_none_match):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    response.headers["ETag"] = etag
+    return response
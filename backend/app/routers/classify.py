@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Body
+from typing import List
+from app.models import ClassifyItem, ClassifyResult, ClassifyResponse
+from app.analysis import analyze_tasks_async, analysis_cache
+
+router = APIRouter()
+
+MAX_CLASSIFY_ITEMS = 1000
+
+@router.post("", response_model=ClassifyResponse)
+async def classify_tasks(items: List[ClassifyItem] = Body(..., min_length=1, max_length=MAX_CLASSIFY_ITEMS)):
+    results = []
+    cache_hits = 0
+    
+    # Uncached items are classified in one batch
+    analyses = await analyze_tasks_async([(item.title, item.description) for item in items])
+    for analysis, cached in analyses:
+        cache_hits += cached
+        results.append(ClassifyResult(**analysis))
+    
+    return ClassifyResponse(
+        results=results,
+        cache_hits=cache_hits,
+        cache_hit_ratio=analysis_cache.stats()["hit_ratio"]
+    )
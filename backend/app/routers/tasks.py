@@ -1,58 +1,227 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import Optional
-from app.models import TaskCreate, TaskUpdate, TaskResponse, TaskListResponse
-from app.database import get_db
-from app.classification import classify_task
-from app.entity_extraction import extract_entities
-from datetime import datetime
+import base64
+import csv
+import io
+import json
+import re
+from fastapi import APIRouter, Body, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Optional, Tuple
+from app.models import (
+    TaskCreate, TaskUpdate, TaskResponse, TaskListResponse,
+    TaskBulkItemResult, TaskBulkResponse, TaskFilter, TaskBulkUpdate,
+    TaskBulkMutationResponse, TaskStatsResponse, TaskChangesResponse, TaskHistoryResponse
+)
+from app.database import get_storage, run_db
+from app.analysis import analyze_task_async, analyze_tasks_async
+from app.history import history_writer
+from app.responses import FastJSONResponse, conditional_response, task_payload
+from app.deadlines import deadline_scheduler, normalise_due_date, resolve_due_at
+from datetime import datetime, timedelta
 
 router = APIRouter()
 
-@router.post("", response_model=TaskResponse, status_code=201)
-async def create_task(task: TaskCreate):
-    db = get_db()
+MAX_BULK_TASKS = 10000
+BULK_INSERT_CHUNK_SIZE = 1000
+EXPORT_CHUNK_SIZE = 500
+MAX_CHANGES = 1000
+MAX_HISTORY_PAGE = 100
+
+EXPORT_COLUMNS = list(TaskResponse.model_fields)
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+def _encode_cursor(task: dict, column: str = "created_at") -> str:
+    raw = json.dumps([task[column], task["id"]]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _decode_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, task_id = json.loads(raw)
+        # Only a timestamp and an integer id may go on to a storage filter.
+        datetime.fromisoformat(created_at)
+        if not isinstance(task_id, int) or isinstance(task_id, bool):
+            raise ValueError("cursor id must be an integer")
+        return created_at, task_id
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _encode_change_cursor(change: dict) -> str:
+    raw = json.dumps([change["change_xid"], change["change_seq"]]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _decode_change_cursor(cursor: str) -> Tuple[int, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        change_xid, change_seq = json.loads(raw)
+        return int(change_xid), int(change_seq)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _analysis_fields(classification: dict, assigned_to: Optional[str]) -> dict:
+    entities = classification["entities"]
     
-    classification = classify_task(task.title, task.description)
-    entities = extract_entities(task.title, task.description)
+    if assigned_to:
+        if assigned_to not in entities["people"]:
+            entities["people"].append(assigned_to)
     
-    if task.assigned_to:
-        if task.assigned_to not in entities["people"]:
-            entities["people"].append(task.assigned_to)
+    return {
+        "category": classification["category"],
+        "priority": classification["priority"],
+        "extracted_entities": entities,
+        "suggested_actions": classification["suggested_actions"]
+    }
+
+def _build_task_data(task: TaskCreate, classification: dict, now: str) -> dict:
+    analysis = _analysis_fields(classification, task.assigned_to)
+    due_at = resolve_due_at(
+        task.due_date, analysis["extracted_entities"]["dates"], datetime.fromisoformat(now)
+    )
     
-    task_data = {
+    return {
         "title": task.title,
         "description": task.description,
-        "category": classification["category"],
-        "priority": classification["priority"],
+        **analysis,
         "status": "pending",
         "due_date": task.due_date,
+        "due_at": due_at,
         "assigned_to": task.assigned_to,
-        "extracted_entities": entities,
-        "suggested_actions": classification["suggested_actions"],
-        "created_at": datetime.utcnow().isoformat(),
-        "updated_at": datetime.utcnow().isoformat()
+        "created_at": now,
+        "updated_at": now
     }
+
+def _sync_deadline(task: dict) -> None:
+    if task["status"] == "completed":
+        deadline_scheduler.cancel(task["id"])
+    else:
+        deadline_scheduler.schedule(task["id"], task.get("due_at"))
+
+def _created_history(task_id: int, now: str) -> dict:
+    return {
+        "task_id": task_id,
+        "action": "created",
+        "changed_by": "system",
+        "changes": {"status": "created"},
+        "created_at": now
+    }
+
+@router.post("", response_model=TaskResponse, status_code=201)
+async def create_task(task: TaskCreate):
+    storage = get_storage()
+    
+    now = datetime.utcnow().isoformat()
+    classification, _ = await analyze_task_async(task.title, task.description)
+    task_data = _build_task_data(task, classification, now)
     
     try:
-        result = db.table("tasks").insert(task_data).execute()
-        if not result.data:
-            raise HTTPException(status_code=500, detail="Failed to create task")
-        
-        created_task = result.data[0]
+        created_task = await run_db(storage.create_task, task_data)
         
-        history_data = {
-            "task_id": created_task["id"],
-            "action": "created",
-            "changed_by": "system",
-            "changes": {"status": "created"},
-            "created_at": datetime.utcnow().isoformat()
-        }
-        db.table("task_history").insert(history_data).execute()
+        await history_writer.enqueue([_created_history(created_task["id"], now)])
+        _sync_deadline(created_task)
         
         return TaskResponse(**created_task)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating task: {str(e)}")
 
+@router.post("/bulk", response_model=TaskBulkResponse, status_code=201)
+async def create_tasks_bulk(tasks: List[TaskCreate] = Body(..., min_length=1, max_length=MAX_BULK_TASKS)):
+    storage = get_storage()
+    
+    now = datetime.utcnow().isoformat()
+    results = [TaskBulkItemResult(index=index) for index in range(len(tasks))]
+    
+    # Classified and scanned as one batch, off the event loop
+    try:
+        analyses = await analyze_tasks_async([(task.title, task.description) for task in tasks])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error classifying tasks: {str(e)}")
+    pending = [
+        (index, _build_task_data(task, classification, now))
+        for index, (task, (classification, _)) in enumerate(zip(tasks, analyses))
+    ]
+    
+    # One tasks insert per chunk; a failed chunk only marks its own items
+    # as failed. History rows go to the write-behind queue.
+    for start in range(0, len(pending), BULK_INSERT_CHUNK_SIZE):
+        chunk = pending[start:start + BULK_INSERT_CHUNK_SIZE]
+        try:
+            created_tasks = await run_db(storage.create_tasks, [task_data for _, task_data in chunk])
+        except Exception as e:
+            for index, _ in chunk:
+                results[index].error = f"Error creating task: {str(e)}"
+            continue
+        
+        for (index, _), created_task in zip(chunk, created_tasks):
+            results[index].task = TaskResponse(**created_task)
+            _sync_deadline(created_task)
+        
+        await history_writer.enqueue(
+            [_created_history(created_task["id"], now) for created_task in created_tasks]
+        )
+    
+    created = sum(1 for item in results if item.task is not None)
+    return TaskBulkResponse(
+        results=results,
+        created=created,
+        failed=len(results) - created
+    )
+
+def _require_filter(task_filter: TaskFilter) -> dict:
+    filters = task_filter.model_dump(exclude_none=True)
+    if not filters:
+        raise HTTPException(status_code=400, detail="At least one filter is required")
+    return filters
+
+@router.patch("/bulk", response_model=TaskBulkMutationResponse)
+async def update_tasks_bulk(bulk_update: TaskBulkUpdate):
+    storage = get_storage()
+    
+    filters = _require_filter(bulk_update.filter)
+    changes = bulk_update.changes.model_dump(exclude_none=True)
+    if not changes:
+        raise HTTPException(status_code=400, detail="No changes given")
+    
+    now = datetime.utcnow().isoformat()
+    history_data = {
+        "action": "updated",
+        "changed_by": "system",
+        "changes": changes,
+        "created_at": now
+    }
+    
+    try:
+        updated_tasks = await run_db(
+            storage.update_tasks, {**changes, "updated_at": now}, history_data, **filters
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error updating tasks: {str(e)}")
+    
+    for task in updated_tasks:
+        _sync_deadline(task)
+    
+    ids = [task["id"] for task in updated_tasks]
+    return TaskBulkMutationResponse(affected=len(ids), ids=ids)
+
+@router.delete("", response_model=TaskBulkMutationResponse)
+async def delete_tasks_bulk(
+    ids: Optional[List[int]] = Query(None, max_length=10000),
+    category: Optional[str] = None,
+    priority: Optional[str] = None,
+    status: Optional[str] = None
+):
+    storage = get_storage()
+    
+    filters = _require_filter(TaskFilter(ids=ids, category=category, priority=priority, status=status))
+    
+    try:
+        await history_writer.flush()
+        deleted_ids = await run_db(storage.delete_tasks, **filters)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error deleting tasks: {str(e)}")
+    
+    deadline_scheduler.cancel_many(deleted_ids)
+    
+    return TaskBulkMutationResponse(affected=len(deleted_ids), ids=deleted_ids)
+
 @router.get("", response_model=TaskListResponse)
 async def get_tasks(
     page: int = Query(1, ge=1),
@@ -60,142 +229,347 @@ async def get_tasks(
     category: Optional[str] = None,
     priority: Optional[str] = None,
     status: Optional[str] = None,
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None)
 ):
-    db = get_db()
+    storage = get_storage()
+    
+    # With a cursor the page is a keyset seek after the last row the client
+    # saw, so `page` is ignored and inserts never shift what comes next.
+    after = _decode_cursor(cursor) if cursor else None
+    offset = 0 if after else (page - 1) * page_size
     
     try:
-        query = db.table("tasks").select("*")
-        
-        if category:
-            query = query.eq("category", category)
-        if priority:
-            query = query.eq("priority", priority)
-        if status:
-            query = query.eq("status", status)
-        
-        all_tasks = query.execute().data
-        
-        if search:
-            search_lower = search.lower()
-            all_tasks = [
-                task for task in all_tasks
-                if search_lower in task.get("title", "").lower() or
-                   search_lower in task.get("description", "").lower()
-            ]
+        tasks, total = await run_db(
+            storage.list_tasks,
+            offset=offset,
+            limit=page_size + 1,
+            category=category,
+            priority=priority,
+            status=status,
+            search=search,
+            after=after
+        )
         
-        total = len(all_tasks)
+        has_more = len(tasks) > page_size
+        tasks = tasks[:page_size]
         total_pages = (total + page_size - 1) // page_size
-        start = (page - 1) * page_size
-        end = start + page_size
         
-        paginated_tasks = all_tasks[start:end]
-        task_responses = [TaskResponse(**task) for task in paginated_tasks]
-        
-        return TaskListResponse(
-            tasks=task_responses,
-            total=total,
-            page=page,
-            page_size=page_size,
-            total_pages=total_pages
-        )
+        # Rows come from our own storage, so they skip model validation and
+        # are encoded straight to JSON; response_model still documents them.
+        return conditional_response({
+            "tasks": [task_payload(task) for task in tasks],
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": total_pages,
+            "next_cursor": _encode_cursor(tasks[-1]) if has_more else None
+        }, if_none_match)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching tasks: {str(e)}")
 
-@router.get("/{task_id}", response_model=TaskResponse)
-async def get_task(task_id: int):
-    db = get_db()
+@router.get("/search", response_model=TaskListResponse)
+async def search_tasks(
+    q: str = Query(..., min_length=1, max_length=200),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(10, ge=1, le=100)
+):
+    storage = get_storage()
     
     try:
-        result = db.table("tasks").select("*").eq("id", task_id).execute()
-        
-        if not result.data:
-            raise HTTPException(status_code=404, detail=f"Task with id {task_id} not found")
+        tasks, total = await run_db(
+            storage.search_tasks, q, offset=(page - 1) * page_size, limit=page_size
+        )
         
-        return TaskResponse(**result.data[0])
-    except HTTPException:
-        raise
+        return FastJSONResponse({
+            "tasks": [task_payload(task) for task in tasks],
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": (total + page_size - 1) // page_size,
+            "next_cursor": None
+        })
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching task: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error searching tasks: {str(e)}")
 
-@router.patch("/{task_id}", response_model=TaskResponse)
-async def update_task(task_id: int, task_update: TaskUpdate):
-    db = get_db()
+@router.get("/stats", response_model=TaskStatsResponse)
+async def get_task_stats(due_soon_days: int = Query(7, ge=1, le=365)):
+    storage = get_storage()
     
-    existing = db.table("tasks").select("*").eq("id", task_id).execute()
-    if not existing.data:
-        raise HTTPException(status_code=404, detail=f"Task with id {task_id} not found")
+    # Truncated to the minute so the cached counts are reused within it
+    now = datetime.utcnow().replace(second=0, microsecond=0)
+    due_soon_before = (now + timedelta(days=due_soon_days)).isoformat()
     
-    update_data = {
-        "updated_at": datetime.utcnow().isoformat()
-    }
+    try:
+        # One GROUP BY over (category, priority, status): a few dozen rows
+        # however many tasks there are, folded into each dimension here.
+        counts = await run_db(storage.count_tasks, now.isoformat(), due_soon_before)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching task stats: {str(e)}")
     
-    changes = {}
+    stats = TaskStatsResponse(
+        total=0, by_category={}, by_priority={}, by_status={},
+        overdue=0, due_soon=0, due_soon_days=due_soon_days
+    )
+    for row in counts:
+        stats.total += row["count"]
+        stats.overdue += row["overdue"] or 0
+        stats.due_soon += row["due_soon"] or 0
+        for dimension in ("category", "priority", "status"):
+            totals = getattr(stats, f"by_{dimension}")
+            totals[row[dimension]] = totals.get(row[dimension], 0) + row["count"]
     
-    if task_update.title is not None:
-        update_data["title"] = task_update.title
-        changes["title"] = task_update.title
+    return stats
+
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+def _parse_duration(value: str) -> timedelta:
+    match = re.fullmatch(r"(\d+)([smhdw]?)", value.strip().lower())
+    if not match:
+        raise HTTPException(status_code=400, detail="Invalid duration, expected e.g. 30m, 24h or 7d")
+    return timedelta(seconds=int(match.group(1)) * DURATION_UNITS[match.group(2) or "s"])
+
+@router.get("/due", response_model=List[TaskResponse])
+async def get_due_tasks(
+    within: str = Query("24h"),
+    include_overdue: bool = False,
+    limit: int = Query(100, ge=1, le=1000)
+):
+    storage = get_storage()
     
-    if task_update.description is not None:
-        update_data["description"] = task_update.description
-        changes["description"] = task_update.description
+    now = datetime.utcnow()
+    try:
+        before = (now + _parse_duration(within)).isoformat(timespec="seconds")
+    except OverflowError:
+        raise HTTPException(status_code=400, detail="Duration is too long")
+    after = None if include_overdue else now.isoformat(timespec="seconds")
     
-    if task_update.due_date is not None:
-        update_data["due_date"] = task_update.due_date
-        changes["due_date"] = task_update.due_date
+    try:
+        tasks = await run_db(storage.due_tasks, before, after, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching due tasks: {str(e)}")
     
-    if task_update.assigned_to is not None:
-        update_data["assigned_to"] = task_update.assigned_to
-        changes["assigned_to"] = task_update.assigned_to
+    return FastJSONResponse([task_payload(task) for task in tasks])
+
+@router.get("/changes", response_model=TaskChangesResponse)
+async def get_task_changes(
+    since: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=MAX_CHANGES)
+):
+    storage = get_storage()
     
-    if task_update.category is not None:
-        update_data["category"] = task_update.category
-        changes["category"] = task_update.category
+    # `since` is the next_since of the previous call, the (change_xid,
+    # change_seq) key of the last change it returned. Without it the feed
+    # starts from the oldest change.
+    after = _decode_change_cursor(since) if since else None
     
-    if task_update.priority is not None:
-        update_data["priority"] = task_update.priority
-        changes["priority"] = task_update.priority
+    try:
+        tasks, tombstones = await run_db(storage.list_changes, limit + 1, after)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching changes: {str(e)}")
     
-    if task_update.status is not None:
-        update_data["status"] = task_update.status
-        changes["status"] = task_update.status
+    # Both streams are ordered on the same key and read from one snapshot,
+    # so merging them and cutting at `limit` keeps them in step.
+    changes = sorted(
+        [(task, False) for task in tasks] + [(tombstone, True) for tombstone in tombstones],
+        key=lambda change: (change[0]["change_xid"], change[0]["change_seq"])
+    )
+    has_more = len(changes) > limit
+    changes = changes[:limit]
     
-    try:
-        result = db.table("tasks").update(update_data).eq("id", task_id).execute()
+    next_since = _encode_change_cursor(changes[-1][0]) if changes else since
+    
+    return FastJSONResponse({
+        "tasks": [task_payload(row) for row, deleted in changes if not deleted],
+        "deleted": [
+            {"id": row["id"], "deleted_at": row["deleted_at"]}
+            for row, deleted in changes if deleted
+        ],
+        "next_since": next_since,
+        "has_more": has_more
+    })
+
+async def _export_rows(
+    export_format: str,
+    category: Optional[str],
+    priority: Optional[str],
+    status: Optional[str]
+) -> AsyncIterator[str]:
+    storage = get_storage()
+    
+    if export_format == "csv":
+        yield _csv_line(EXPORT_COLUMNS)
+    
+    # Walk the table by keyset so each chunk is an index seek and only one
+    # chunk is held in memory at a time.
+    after = None
+    while True:
+        chunk = await run_db(
+            storage.scan_tasks, EXPORT_CHUNK_SIZE, after,
+            category=category, priority=priority, status=status
+        )
+        for task in chunk:
+            if export_format == "csv":
+                yield _csv_line([
+                    json.dumps(task.get(column)) if isinstance(task.get(column), (dict, list))
+                    else task.get(column)
+                    for column in EXPORT_COLUMNS
+                ])
+            else:
+                yield json.dumps({column: task.get(column) for column in EXPORT_COLUMNS}) + "\n"
         
-        if not result.data:
-            raise HTTPException(status_code=500, detail="Failed to update task")
+        if len(chunk) < EXPORT_CHUNK_SIZE:
+            break
+        after = (chunk[-1]["created_at"], chunk[-1]["id"])
+
+def _csv_line(values: list) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue()
+
+@router.get("/export")
+async def export_tasks(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    category: Optional[str] = None,
+    priority: Optional[str] = None,
+    status: Optional[str] = None
+):
+    return StreamingResponse(
+        _export_rows(format, category, priority, status),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{format}"'}
+    )
+
+@router.get("/{task_id}", response_model=TaskResponse)
+async def get_task(task_id: int, if_none_match: Optional[str] = Header(None)):
+    storage = get_storage()
+    
+    try:
+        task = await run_db(storage.get_task, task_id)
         
-        if changes:
-            history_data = {
-                "task_id": task_id,
-                "action": "updated",
-                "changed_by": "system",
-                "changes": changes,
-                "created_at": datetime.utcnow().isoformat()
-            }
-            db.table("task_history").insert(history_data).execute()
+        if task is None:
+            raise HTTPException(status_code=404, detail=f"Task with id {task_id} not found")
         
-        return TaskResponse(**result.data[0])
+        return conditional_response(task_payload(task), if_none_match)
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error updating task: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error fetching task: {str(e)}")
 
-@router.delete("/{task_id}", status_code=204)
-async def delete_task(task_id: int):
-    db = get_db()
+@router.get("/{task_id}/history", response_model=TaskHistoryResponse)
+async def get_task_history(
+    task_id: int,
+    limit: int = Query(20, ge=1, le=MAX_HISTORY_PAGE),
+    cursor: Optional[str] = None
+):
+    storage = get_storage()
     
-    existing = db.table("tasks").select("*").eq("id", task_id).execute()
-    if not existing.data:
-        raise HTTPException(status_code=404, detail=f"Task with id {task_id} not found")
+    # Entries are paged by (created_at, id) rather than id alone: "created"
+    # entries go through the write-behind queue and may be inserted after
+    # later edits. The queue is not flushed here, so a read never pays for
+    # other requests' writes; a just-queued entry shows up within a flush
+    # interval.
+    before = _decode_cursor(cursor) if cursor else None
     
     try:
-        db.table("task_history").delete().eq("task_id", task_id).execute()
-        db.table("tasks").delete().eq("id", task_id).execute()
-        
-        return None
+        entries = await run_db(storage.list_history, task_id, limit + 1, before)
+        if not entries and before is None and await run_db(storage.get_task, task_id) is None:
+            raise HTTPException(status_code=404, detail=f"Task with id {task_id} not found")
     except HTTPException:
         raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching task history: {str(e)}")
+    
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    return TaskHistoryResponse(
+        entries=entries,
+        next_cursor=_encode_cursor(entries[-1]) if has_more else None
+    )
+
+@router.patch("/{task_id}", response_model=TaskResponse)
+async def update_task(task_id: int, task_update: TaskUpdate):
+    storage = get_storage()
+    
+    now = datetime.utcnow().isoformat()
+    changes = task_update.model_dump(exclude_none=True)
+    update_data = {}
+    
+    if "title" in changes or "description" in changes:
+        # Text edits need the current row: to skip no-op edits and to
+        # reclassify with the field that was not sent.
+        existing = await run_db(storage.get_task, task_id)
+        if existing is None:
+            raise HTTPException(status_code=404, detail=f"Task with id {task_id} not found")
+        
+        for field in ("title", "description"):
+            if changes.get(field) == existing[field]:
+                del changes[field]
+        
+        if "title" in changes or "description" in changes:
+            classification, _ = await analyze_task_async(
+                changes.get("title", existing["title"]),
+                changes.get("description", existing["description"])
+            )
+            analysis = _analysis_fields(classification, changes.get("assigned_to", existing["assigned_to"]))
+            # An explicit category or priority in the request wins
+            for field in ("category", "priority"):
+                if field not in changes and analysis[field] != existing[field]:
+                    changes[field] = analysis.pop(field)
+                else:
+                    analysis.pop(field)
+            update_data.update(analysis)
+            update_data["due_at"] = resolve_due_at(
+                changes.get("due_date", existing["due_date"]),
+                analysis["extracted_entities"]["dates"],
+                datetime.fromisoformat(now)
+            )
+    
+    if "due_date" in changes and "due_at" not in update_data:
+        # Without the text at hand an unparseable date leaves due_at as is.
+        due_at = normalise_due_date(changes["due_date"])
+        if due_at:
+            update_data["due_at"] = due_at
+    
+    update_data.update(changes)
+    update_data["updated_at"] = now
+    
+    history_data = None
+    if changes:
+        history_data = {
+            "task_id": task_id,
+            "action": "updated",
+            "changed_by": "system",
+            "changes": changes,
+            "created_at": now
+        }
+    
+    try:
+        updated_task = await run_db(storage.update_task, task_id, update_data, history_data)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error updating task: {str(e)}")
+    
+    if updated_task is None:
+        raise HTTPException(status_code=404, detail=f"Task with id {task_id} not found")
+    
+    _sync_deadline(updated_task)
+    return TaskResponse(**updated_task)
+
+@router.delete("/{task_id}", status_code=204)
+async def delete_task(task_id: int):
+    storage = get_storage()
+    
+    try:
+        # Queued history for this task must land before the row goes, or
+        # its insert would violate the foreign key.
+        await history_writer.flush()
+        deleted = await run_db(storage.delete_task, task_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error deleting task: {str(e)}")
+    
+    if not deleted:
+        raise HTTPException(status_code=404, detail=f"Task with id {task_id} not found")
+    
+    deadline_scheduler.cancel(task_id)
+    return None
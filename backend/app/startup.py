@@ -0,0 +1,84 @@
+"""Cold start timing: when the process started, and where import time goes.
+
+Print the modules that take longest to import, run from ``backend/``::
+
+    python -m app.startup --top 25
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Iterable, List, Optional, Tuple
+
+# (module, self microseconds, cumulative microseconds)
+ImportTiming = Tuple[str, int, int]
+
+
+def _process_start_time() -> float:
+    # Linux records the start time in clock ticks since boot. Elsewhere,
+    # fall back to when this module was imported.
+    try:
+        with open("/proc/self/stat") as f:
+            started = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return time.time()
+    return time.time() - uptime + started / os.sysconf("SC_CLK_TCK")
+
+
+PROCESS_STARTED_AT = _process_start_time()
+
+
+def seconds_since_start() -> float:
+    return max(0.0, time.time() - PROCESS_STARTED_AT)
+
+
+def parse_importtime(lines: Iterable[str]) -> List[ImportTiming]:
+    """Read the report that ``python -X importtime`` writes to stderr."""
+    timings = []
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # the header line
+        timings.append((module.strip(), int(self_us), int(cumulative_us)))
+    return timings
+
+
+def import_profile(module: str = "app.main") -> List[ImportTiming]:
+    """Import ``module`` in a fresh interpreter and time every import."""
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=backend, capture_output=True, text=True, check=True,
+    )
+    return parse_importtime(result.stderr.splitlines())
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main", help="module to import")
+    parser.add_argument("--top", type=int, default=25, help="how many modules to list")
+    parser.add_argument("--output", help="also write every timing as JSON to this path")
+    args = parser.parse_args(argv)
+
+    timings = import_profile(args.module)
+    total = next((cumulative for module, _, cumulative in timings if module == args.module), 0)
+    print(f"import {args.module}: {total / 1000:.1f} ms", file=sys.stderr)
+    for module, self_us, cumulative_us in sorted(timings, key=lambda t: t[2], reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:9.1f} ms {self_us / 1000:9.1f} ms  {module}", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                [{"module": m, "self_us": s, "cumulative_us": c} for m, s, c in timings], f, indent=2
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,6 @@
+from app.storage.base import TaskStorage
+from app.storage.cached_storage import CachedStorage
+from app.storage.sqlite_storage import SQLiteStorage
+from app.storage.supabase_storage import SupabaseStorage
+
+__all__ = ["TaskStorage", "CachedStorage", "SQLiteStorage", "SupabaseStorage"]
@@ -0,0 +1,161 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+
+class TaskStorage(ABC):
+    """Persistence for tasks and their history.
+
+    Methods are synchronous and may block on I/O; route handlers call them
+    through ``app.database.run_db``. Rows are plain dicts shaped like the
+    ``tasks`` and ``task_history`` tables in ``schema.sql``, with JSON
+    columns already decoded.
+    """
+
+    @abstractmethod
+    def create_tasks(self, tasks: List[Dict]) -> List[Dict]:
+        """Insert rows in one statement and return them, in input order."""
+
+    @abstractmethod
+    def get_task(self, task_id: int) -> Optional[Dict]:
+        ...
+
+    @abstractmethod
+    def list_tasks(
+        self,
+        offset: int,
+        limit: int,
+        category: Optional[str] = None,
+        priority: Optional[str] = None,
+        status: Optional[str] = None,
+        search: Optional[str] = None,
+        after: Optional[Tuple[str, int]] = None,
+    ) -> Tuple[List[Dict], int]:
+        """Return one page of tasks, newest first, and the matching total.
+
+        ``after`` is a ``(created_at, id)`` keyset cursor: only rows that sort
+        after it are returned, and both ``offset`` and the total count from
+        there.
+        """
+
+    @abstractmethod
+    def scan_tasks(
+        self,
+        limit: int,
+        after: Optional[Tuple[str, int]] = None,
+        category: Optional[str] = None,
+        priority: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> List[Dict]:
+        """Return up to ``limit`` tasks after the ``after`` keyset, uncounted.
+
+        Used to walk the whole table in fixed-size chunks.
+        """
+
+    @abstractmethod
+    def search_tasks(self, query: str, offset: int, limit: int) -> Tuple[List[Dict], int]:
+        """Full-text search over title and description, best match first."""
+
+    @abstractmethod
+    def count_tasks(self, now: str, due_soon_before: str) -> List[Dict]:
+        """Count tasks grouped by (category, priority, status).
+
+        Each row also counts the unfinished tasks whose ``due_at`` is before
+        ``now`` (``overdue``) or from ``now`` up to ``due_soon_before``
+        (``due_soon``).
+        """
+
+    @abstractmethod
+    def due_tasks(self, before: str, after: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        """Unfinished tasks with ``after <= due_at < before``, soonest first."""
+
+    @abstractmethod
+    def list_deadlines(self) -> List[Tuple[int, str]]:
+        """``(id, due_at)`` of every unfinished task that has a due time."""
+
+    @abstractmethod
+    def list_changes(
+        self, limit: int, after: Optional[Tuple[int, int]] = None
+    ) -> Tuple[List[Dict], List[Dict]]:
+        """Tasks updated and tasks deleted after a ``(change_xid, change_seq)`` key.
+
+        The database stamps every insert, update and delete with its
+        transaction and the next ``change_seq`` from a single counter.
+        Returns up to ``limit`` tasks and up to ``limit`` tombstones,
+        ``{"id", "deleted_at", "change_xid", "change_seq"}`` dicts, each
+        ordered by that key and read from one snapshot. Changes are held
+        back while an older transaction is still in flight, so nothing
+        commits later below a key already returned. Every deleted task
+        leaves a tombstone.
+        """
+
+    @abstractmethod
+    def update_task(self, task_id: int, data: Dict, history: Optional[Dict] = None) -> Optional[Dict]:
+        """Apply ``data`` and return the updated row, or None if it is gone.
+
+        A ``history`` entry is written in the same round-trip, and only if
+        the row was updated.
+        """
+
+    @abstractmethod
+    def update_tasks(
+        self,
+        data: Dict,
+        history: Optional[Dict] = None,
+        ids: Optional[List[int]] = None,
+        category: Optional[str] = None,
+        priority: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> List[Dict]:
+        """Apply ``data`` to every matching task and return the updated rows.
+
+        Matching rows are updated in one statement. If ``history`` is given,
+        each updated row gets a copy of it, inserted in one batch.
+        """
+
+    @abstractmethod
+    def delete_task(self, task_id: int) -> bool:
+        """Delete a task together with its history; False if it was not found."""
+
+    @abstractmethod
+    def delete_tasks(
+        self,
+        ids: Optional[List[int]] = None,
+        category: Optional[str] = None,
+        priority: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> List[int]:
+        """Delete every matching task in one statement and return their ids."""
+
+    @abstractmethod
+    def add_history(self, entries: List[Dict]) -> None:
+        """Insert ``task_history`` rows in one statement."""
+
+    @abstractmethod
+    def list_history(
+        self, task_id: int, limit: int, before: Optional[Tuple[str, int]] = None
+    ) -> List[Dict]:
+        """One task's history entries, newest first by ``(created_at, id)``.
+
+        ``before`` is a ``(created_at, id)`` keyset: only older entries are
+        returned.
+        """
+
+    @abstractmethod
+    def scan_history(
+        self, action: str, created_before: str, limit: int, after: Optional[Tuple[int, int]] = None
+    ) -> List[Dict]:
+        """History entries of one ``action`` created before ``created_before``.
+
+        Ordered by ``(task_id, id)`` and starting after the ``after`` keyset,
+        so the whole table can be walked one task at a time.
+        """
+
+    @abstractmethod
+    def replace_history(self, snapshots: List[Dict], delete_ids: List[int]) -> None:
+        """Overwrite entries with ``snapshots`` by ``id`` and delete ``delete_ids``."""
+
+    def create_task(self, task: Dict) -> Dict:
+        return self.create_tasks([task])[0]
+
+    def close(self) -> None:
+        pass
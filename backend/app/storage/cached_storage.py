@@ -0,0 +1,144 @@
+from typing import Dict, List, Optional, Tuple
+
+from app.cache import TaskCache
+from app.storage.base import TaskStorage
+
+
+class CachedStorage(TaskStorage):
+    """Read-through cache in front of another storage backend.
+
+    Single tasks and unsearched list pages are served from ``cache``; writes
+    made through this wrapper invalidate the entries they affect.
+    """
+
+    def __init__(self, storage: TaskStorage, cache: TaskCache):
+        self.storage = storage
+        self.cache = cache
+
+    def create_tasks(self, tasks: List[Dict]) -> List[Dict]:
+        created = self.storage.create_tasks(tasks)
+        self.cache.invalidate_tasks(created)
+        return created
+
+    def get_task(self, task_id: int) -> Optional[Dict]:
+        key = self.cache.task_key(task_id)
+        task = self.cache.get_task(key)
+        if task is None:
+            task = self.storage.get_task(task_id)
+            if task is not None:
+                self.cache.set_task(key, task)
+        return task
+
+    def list_tasks(
+        self,
+        offset: int,
+        limit: int,
+        category: Optional[str] = None,
+        priority: Optional[str] = None,
+        status: Optional[str] = None,
+        search: Optional[str] = None,
+        after: Optional[Tuple[str, int]] = None,
+    ) -> Tuple[List[Dict], int]:
+        if search:
+            return self.storage.list_tasks(offset, limit, category, priority, status, search, after)
+
+        key = self.cache.list_key((category, priority, status), offset, limit, after)
+        page = self.cache.get_list(key)
+        if page is None:
+            page = self.storage.list_tasks(offset, limit, category, priority, status, after=after)
+            self.cache.set_list(key, *page)
+        return page
+
+    def scan_tasks(
+        self,
+        limit: int,
+        after: Optional[Tuple[str, int]] = None,
+        category: Optional[str] = None,
+        priority: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> List[Dict]:
+        return self.storage.scan_tasks(limit, after, category, priority, status)
+
+    def search_tasks(self, query: str, offset: int, limit: int) -> Tuple[List[Dict], int]:
+        return self.storage.search_tasks(query, offset, limit)
+
+    def count_tasks(self, now: str, due_soon_before: str) -> List[Dict]:
+        key = self.cache.counts_key(now, due_soon_before)
+        counts = self.cache.get_counts(key)
+        if counts is None:
+            counts = self.storage.count_tasks(now, due_soon_before)
+            self.cache.set_counts(key, counts)
+        return counts
+
+    def due_tasks(self, before: str, after: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        return self.storage.due_tasks(before, after, limit)
+
+    def list_deadlines(self) -> List[Tuple[int, str]]:
+        return self.storage.list_deadlines()
+
+    def list_changes(
+        self, limit: int, after: Optional[Tuple[int, int]] = None
+    ) -> Tuple[List[Dict], List[Dict]]:
+        return self.storage.list_changes(limit, after)
+
+    def _invalidate(self, task_id: int, updated: Optional[Dict] = None) -> None:
+        previous = self.cache.peek_task(task_id)
+        if previous is None:
+            self.cache.invalidate_task_id(task_id)
+        affected = [task for task in (previous, updated) if task is not None]
+        self.cache.invalidate_tasks(affected)
+
+    def update_task(self, task_id: int, data: Dict, history: Optional[Dict] = None) -> Optional[Dict]:
+        updated = self.storage.update_task(task_id, data, history)
+        self._invalidate(task_id, updated)
+        return updated
+
+    def update_tasks(
+        self,
+        data: Dict,
+        history: Optional[Dict] = None,
+        ids: Optional[List[int]] = None,
+        category: Optional[str] = None,
+        priority: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> List[Dict]:
+        updated = self.storage.update_tasks(data, history, ids, category, priority, status)
+        if updated:
+            self.cache.invalidate_task_ids([task["id"] for task in updated])
+        return updated
+
+    def delete_task(self, task_id: int) -> bool:
+        deleted = self.storage.delete_task(task_id)
+        self._invalidate(task_id)
+        return deleted
+
+    def delete_tasks(
+        self,
+        ids: Optional[List[int]] = None,
+        category: Optional[str] = None,
+        priority: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> List[int]:
+        deleted = self.storage.delete_tasks(ids, category, priority, status)
+        if deleted:
+            self.cache.invalidate_task_ids(deleted)
+        return deleted
+
+    def add_history(self, entries: List[Dict]) -> None:
+        self.storage.add_history(entries)
+
+    def list_history(
+        self, task_id: int, limit: int, before: Optional[Tuple[str, int]] = None
+    ) -> List[Dict]:
+        return self.storage.list_history(task_id, limit, before)
+
+    def scan_history(
+        self, action: str, created_before: str, limit: int, after: Optional[Tuple[int, int]] = None
+    ) -> List[Dict]:
+        return self.storage.scan_history(action, created_before, limit, after)
+
+    def replace_history(self, snapshots: List[Dict], delete_ids: List[int]) -> None:
+        self.storage.replace_history(snapshots, delete_ids)
+
+    def close(self) -> None:
+        self.storage.close()
@@ -0,0 +1,498 @@
+import json
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.storage.base import TaskStorage
+
+# Mirrors schema.sql; JSONB columns are stored as JSON text.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title VARCHAR(200) NOT NULL,
+    description TEXT NOT NULL,
+    category VARCHAR(50) NOT NULL DEFAULT 'general',
+    priority VARCHAR(20) NOT NULL DEFAULT 'medium',
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    due_date VARCHAR(50),
+    due_at TEXT,
+    assigned_to VARCHAR(100),
+    extracted_entities TEXT DEFAULT '{}',
+    suggested_actions TEXT DEFAULT '[]',
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now')),
+    updated_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now')),
+    change_seq INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS task_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    task_id INTEGER NOT NULL REFERENCES tasks(id) ON DELETE CASCADE,
+    action VARCHAR(50) NOT NULL,
+    changed_by VARCHAR(100),
+    changes TEXT DEFAULT '{}',
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_tasks_category ON tasks(category);
+CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks(priority);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
+CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON tasks(created_at);
+CREATE INDEX IF NOT EXISTS idx_task_history_task_id ON task_history(task_id);
+CREATE INDEX IF NOT EXISTS idx_task_history_task_created ON task_history(task_id, created_at, id);
+"""
+
+# Inverted index over title and description, kept in step with the tasks
+# table by triggers. Plays the role of the search_vector GIN index.
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+    title, description, content='tasks', content_rowid='id'
+);
+
+CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+    INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+    INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
+    VALUES ('delete', old.id, old.title, old.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN
+    INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
+    VALUES ('delete', old.id, old.title, old.description);
+    INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+END;
+"""
+
+# due_at is the due date normalised to a sortable naive UTC timestamp.
+# Databases created before it existed get the column on open, backfilled
+# from due dates already in ISO form. Values that only look like dates
+# (2024-13-45, or 2024-02-30, which SQLite rolls over) are left NULL.
+DUE_AT_MIGRATION = """
+ALTER TABLE tasks ADD COLUMN due_at TEXT;
+UPDATE tasks SET due_at = CASE
+    WHEN length(due_date) = 10 THEN due_date || 'T00:00:00'
+    ELSE replace(substr(due_date, 1, 19), ' ', 'T')
+END
+WHERE due_date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*'
+  AND date(substr(due_date, 1, 10), '+0 days') = substr(due_date, 1, 10);
+"""
+
+DUE_AT_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_tasks_due_at ON tasks(due_at) WHERE status != 'completed';
+"""
+
+# Delta sync: every insert, update and delete takes the next number from one
+# counter, so live rows and tombstones page on a single key that the database
+# assigns at write time. Triggers see each statement, however it was issued.
+CHANGES_SCHEMA = """
+CREATE INDEX IF NOT EXISTS idx_tasks_change_seq ON tasks(change_seq);
+
+CREATE TABLE IF NOT EXISTS task_tombstones (
+    task_id INTEGER PRIMARY KEY,
+    deleted_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now')),
+    change_seq INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_task_tombstones_change_seq ON task_tombstones(change_seq);
+
+CREATE TABLE IF NOT EXISTS task_change_counter (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    seq INTEGER NOT NULL
+);
+
+INSERT OR IGNORE INTO task_change_counter (id, seq) SELECT 1, max(
+    coalesce((SELECT max(change_seq) FROM tasks), 0),
+    coalesce((SELECT max(change_seq) FROM task_tombstones), 0)
+);
+
+CREATE TRIGGER IF NOT EXISTS tasks_change_seq_insert AFTER INSERT ON tasks BEGIN
+    UPDATE task_change_counter SET seq = seq + 1;
+    UPDATE tasks SET change_seq = (SELECT seq FROM task_change_counter) WHERE id = new.id;
+END;
+
+-- The insert trigger's own UPDATE changes change_seq and is skipped here.
+CREATE TRIGGER IF NOT EXISTS tasks_change_seq_update AFTER UPDATE ON tasks
+WHEN new.change_seq IS old.change_seq BEGIN
+    UPDATE task_change_counter SET seq = seq + 1;
+    UPDATE tasks SET change_seq = (SELECT seq FROM task_change_counter) WHERE id = new.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS tasks_tombstone AFTER DELETE ON tasks BEGIN
+    UPDATE task_change_counter SET seq = seq + 1;
+    INSERT OR IGNORE INTO task_tombstones (task_id, change_seq)
+    VALUES (old.id, (SELECT seq FROM task_change_counter));
+END;
+"""
+
+TASK_COLUMNS = (
+    "title", "description", "category", "priority", "status", "due_date", "due_at",
+    "assigned_to", "extracted_entities", "suggested_actions", "created_at", "updated_at",
+)
+HISTORY_COLUMNS = ("task_id", "action", "changed_by", "changes", "created_at")
+JSON_COLUMNS = ("extracted_entities", "suggested_actions", "changes")
+
+
+def _encode(row: Dict) -> Dict:
+    return {
+        key: json.dumps(value) if key in JSON_COLUMNS and value is not None else value
+        for key, value in row.items()
+    }
+
+
+def _decode(row: sqlite3.Row) -> Dict:
+    data = dict(row)
+    for key in JSON_COLUMNS:
+        if data.get(key) is not None:
+            data[key] = json.loads(data[key])
+    return data
+
+
+def _match_expression(query: str) -> str:
+    # Quote every term so user input is never parsed as FTS5 syntax; the
+    # terms are ANDed and each one matches as a prefix.
+    terms = re.findall(r"\w+", query)
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _like_pattern(search: str) -> str:
+    escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class SQLiteStorage(TaskStorage):
+    """Tasks stored in an embedded SQLite database.
+
+    File databases run in WAL mode with one connection per thread, so reads
+    from the ``run_db`` pool proceed concurrently with a single writer.
+    ``":memory:"`` uses one shared connection behind a lock instead, since
+    each in-memory connection would otherwise see its own empty database.
+    """
+
+    def __init__(self, path: str = "tasks.db"):
+        self.path = path
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._shared_lock = threading.RLock() if path == ":memory:" else None
+        self._shared = self._open() if self._shared_lock else None
+
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(tasks)")}
+            if "due_at" not in columns:
+                conn.executescript(DUE_AT_MIGRATION)
+            conn.executescript(DUE_AT_INDEX)
+            conn.executescript(CHANGES_SCHEMA)
+            has_index = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'tasks_fts'"
+            ).fetchone()
+            conn.executescript(SEARCH_SCHEMA)
+            if not has_index:
+                conn.execute("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA busy_timeout = 5000")
+        if self.path != ":memory:":
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        if self._shared is not None:
+            with self._shared_lock:
+                yield self._shared
+            return
+
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._open()
+        yield conn
+
+    @contextmanager
+    def _transaction(self, mode: str = "IMMEDIATE") -> Iterator[sqlite3.Connection]:
+        with self._connection() as conn:
+            conn.execute(f"BEGIN {mode}")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def create_tasks(self, tasks: List[Dict]) -> List[Dict]:
+        if not tasks:
+            return []
+
+        placeholders = ", ".join(f":{column}" for column in TASK_COLUMNS)
+        sql = f"INSERT INTO tasks ({', '.join(TASK_COLUMNS)}) VALUES ({placeholders})"
+        rows = [_encode({column: task.get(column) for column in TASK_COLUMNS}) for task in tasks]
+
+        with self._transaction() as conn:
+            ids = []
+            for row in rows:
+                ids.append(conn.execute(sql, row).lastrowid)
+            created = conn.execute(
+                f"SELECT * FROM tasks WHERE id IN ({', '.join('?' * len(ids))}) ORDER BY id", ids
+            ).fetchall()
+        return [_decode(row) for row in created]
+
+    def get_task(self, task_id: int) -> Optional[Dict]:
+        with self._connection() as conn:
+            row = conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return _decode(row) if row else None
+
+    @staticmethod
+    def _where(category, priority, status, search=None, after=None, ids=None) -> Tuple[str, List]:
+        clauses = []
+        params: List = []
+
+        if ids is not None:
+            clauses.append(f"id IN ({', '.join('?' * len(ids))})")
+            params.extend(ids)
+
+        for column, value in (("category", category), ("priority", priority), ("status", status)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if search:
+            pattern = _like_pattern(search)
+            clauses.append("(title LIKE ? ESCAPE '\\' OR description LIKE ? ESCAPE '\\')")
+            params.extend([pattern, pattern])
+        if after:
+            clauses.append("(created_at < ? OR (created_at = ? AND id < ?))")
+            params.extend([after[0], after[0], after[1]])
+
+        return (f" WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+    def list_tasks(
+        self,
+        offset: int,
+        limit: int,
+        category: Optional[str] = None,
+        priority: Optional[str] = None,
+        status: Optional[str] = None,
+        search: Optional[str] = None,
+        after: Optional[Tuple[str, int]] = None,
+    ) -> Tuple[List[Dict], int]:
+        where, params = self._where(category, priority, status, search, after)
+        with self._connection() as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM tasks{where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT * FROM tasks{where} ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+                [*params, limit, offset],
+            ).fetchall()
+        return [_decode(row) for row in rows], total
+
+    def scan_tasks(
+        self,
+        limit: int,
+        after: Optional[Tuple[str, int]] = None,
+        category: Optional[str] = None,
+        priority: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> List[Dict]:
+        where, params = self._where(category, priority, status, after=after)
+        with self._connection() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM tasks{where} ORDER BY created_at DESC, id DESC LIMIT ?",
+                [*params, limit],
+            ).fetchall()
+        return [_decode(row) for row in rows]
+
+    def search_tasks(self, query: str, offset: int, limit: int) -> Tuple[List[Dict], int]:
+        expression = _match_expression(query)
+        if not expression:
+            return [], 0
+
+        with self._connection() as conn:
+            total = conn.execute(
+                "SELECT COUNT(*) FROM tasks_fts WHERE tasks_fts MATCH ?", (expression,)
+            ).fetchone()[0]
+            rows = conn.execute(
+                "SELECT tasks.* FROM tasks_fts JOIN tasks ON tasks.id = tasks_fts.rowid "
+                "WHERE tasks_fts MATCH ? ORDER BY bm25(tasks_fts, 2.0, 1.0), tasks.id DESC "
+                "LIMIT ? OFFSET ?",
+                (expression, limit, offset),
+            ).fetchall()
+        return [_decode(row) for row in rows], total
+
+    def count_tasks(self, now: str, due_soon_before: str) -> List[Dict]:
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT category, priority, status, COUNT(*) AS count, "
+                "SUM(status != 'completed' AND due_at < ?) AS overdue, "
+                "SUM(status != 'completed' AND due_at >= ? AND due_at < ?) AS due_soon "
+                "FROM tasks GROUP BY category, priority, status",
+                (now, now, due_soon_before),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def due_tasks(self, before: str, after: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        clauses = ["status != 'completed'", "due_at < ?"]
+        params: List = [before]
+        if after:
+            clauses.append("due_at >= ?")
+            params.append(after)
+        with self._connection() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM tasks WHERE {' AND '.join(clauses)} ORDER BY due_at, id LIMIT ?",
+                [*params, limit],
+            ).fetchall()
+        return [_decode(row) for row in rows]
+
+    def list_deadlines(self) -> List[Tuple[int, str]]:
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT id, due_at FROM tasks WHERE status != 'completed' AND due_at IS NOT NULL"
+            ).fetchall()
+        return [(row["id"], row["due_at"]) for row in rows]
+
+    def list_changes(
+        self, limit: int, after: Optional[Tuple[int, int]] = None
+    ) -> Tuple[List[Dict], List[Dict]]:
+        # Writers are serialised, so sequence order is commit order and the
+        # sequence doubles as the transaction key. Both reads share one
+        # snapshot, or a write between them could be skipped.
+        after_seq = after[1] if after else 0
+        with self._transaction("DEFERRED") as conn:
+            tasks = conn.execute(
+                "SELECT *, change_seq AS change_xid FROM tasks WHERE change_seq > ? "
+                "ORDER BY change_seq LIMIT ?",
+                (after_seq, limit),
+            ).fetchall()
+            tombstones = conn.execute(
+                "SELECT task_id AS id, deleted_at, change_seq AS change_xid, change_seq "
+                "FROM task_tombstones WHERE change_seq > ? ORDER BY change_seq LIMIT ?",
+                (after_seq, limit),
+            ).fetchall()
+        return [_decode(row) for row in tasks], [dict(row) for row in tombstones]
+
+    def update_task(self, task_id: int, data: Dict, history: Optional[Dict] = None) -> Optional[Dict]:
+        columns = [column for column in data if column in TASK_COLUMNS]
+        if not columns:
+            return self.get_task(task_id)
+
+        assignments = ", ".join(f"{column} = :{column}" for column in columns)
+        params = _encode({column: data[column] for column in columns})
+        params["id"] = task_id
+
+        with self._transaction() as conn:
+            row = conn.execute(f"UPDATE tasks SET {assignments} WHERE id = :id RETURNING *", params).fetchone()
+            if row is not None and history is not None:
+                self._insert_history(conn, [{**history, "task_id": task_id}])
+        return _decode(row) if row else None
+
+    def update_tasks(
+        self,
+        data: Dict,
+        history: Optional[Dict] = None,
+        ids: Optional[List[int]] = None,
+        category: Optional[str] = None,
+        priority: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> List[Dict]:
+        columns = [column for column in data if column in TASK_COLUMNS]
+        if not columns:
+            return []
+
+        assignments = ", ".join(f"{column} = ?" for column in columns)
+        values = _encode({column: data[column] for column in columns})
+        where, params = self._where(category, priority, status, ids=ids)
+
+        with self._transaction() as conn:
+            rows = conn.execute(
+                f"UPDATE tasks SET {assignments}{where} RETURNING *",
+                [*(values[column] for column in columns), *params],
+            ).fetchall()
+            if rows and history is not None:
+                self._insert_history(conn, [{**history, "task_id": row["id"]} for row in rows])
+        return [_decode(row) for row in rows]
+
+    def delete_task(self, task_id: int) -> bool:
+        with self._transaction() as conn:
+            return conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,)).rowcount > 0
+
+    def delete_tasks(
+        self,
+        ids: Optional[List[int]] = None,
+        category: Optional[str] = None,
+        priority: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> List[int]:
+        where, params = self._where(category, priority, status, ids=ids)
+        with self._transaction() as conn:
+            rows = conn.execute(f"DELETE FROM tasks{where} RETURNING id", params).fetchall()
+        return [row["id"] for row in rows]
+
+    @staticmethod
+    def _insert_history(conn: sqlite3.Connection, entries: List[Dict]) -> None:
+        sql = (
+            f"INSERT INTO task_history ({', '.join(HISTORY_COLUMNS)}) "
+            f"VALUES ({', '.join(f':{column}' for column in HISTORY_COLUMNS)})"
+        )
+        conn.executemany(
+            sql, [_encode({column: entry.get(column) for column in HISTORY_COLUMNS}) for entry in entries]
+        )
+
+    def add_history(self, entries: List[Dict]) -> None:
+        if not entries:
+            return
+
+        with self._transaction() as conn:
+            self._insert_history(conn, entries)
+
+    def list_history(
+        self, task_id: int, limit: int, before: Optional[Tuple[str, int]] = None
+    ) -> List[Dict]:
+        sql = "SELECT * FROM task_history WHERE task_id = ?"
+        params: List = [task_id]
+        if before:
+            sql += " AND (created_at < ? OR (created_at = ? AND id < ?))"
+            params.extend([before[0], before[0], before[1]])
+        with self._connection() as conn:
+            rows = conn.execute(
+                f"{sql} ORDER BY created_at DESC, id DESC LIMIT ?", [*params, limit]
+            ).fetchall()
+        return [_decode(row) for row in rows]
+
+    def scan_history(
+        self, action: str, created_before: str, limit: int, after: Optional[Tuple[int, int]] = None
+    ) -> List[Dict]:
+        sql = "SELECT * FROM task_history WHERE action = ? AND created_at < ?"
+        params: List = [action, created_before]
+        if after:
+            sql += " AND (task_id > ? OR (task_id = ? AND id > ?))"
+            params.extend([after[0], after[0], after[1]])
+        with self._connection() as conn:
+            rows = conn.execute(f"{sql} ORDER BY task_id, id LIMIT ?", [*params, limit]).fetchall()
+        return [_decode(row) for row in rows]
+
+    def replace_history(self, snapshots: List[Dict], delete_ids: List[int]) -> None:
+        assignments = ", ".join(f"{column} = :{column}" for column in HISTORY_COLUMNS)
+        with self._transaction() as conn:
+            conn.executemany(
+                f"UPDATE task_history SET {assignments} WHERE id = :id",
+                [
+                    _encode({**{column: entry.get(column) for column in HISTORY_COLUMNS}, "id": entry["id"]})
+                    for entry in snapshots
+                ],
+            )
+            if delete_ids:
+                conn.execute(
+                    f"DELETE FROM task_history WHERE id IN ({', '.join('?' * len(delete_ids))})", delete_ids
+                )
+
+    def close(self) -> None:
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
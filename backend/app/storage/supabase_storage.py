@@ -0,0 +1,246 @@
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from app.storage.base import TaskStorage
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+
+# Explicit columns keep the generated search_vector off the wire.
+TASK_FIELDS = (
+    "id,title,description,category,priority,status,due_date,due_at,assigned_to,"
+    "extracted_entities,suggested_actions,created_at,updated_at"
+)
+
+DEADLINE_PAGE_SIZE = 1000
+
+
+def _ilike_pattern(search: str) -> str:
+    # Escape LIKE wildcards, then quote the value so commas and parentheses
+    # in the search text cannot break out of the PostgREST or=() filter.
+    escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    quoted = escaped.replace("\\", "\\\\").replace('"', '\\"')
+    return f'"*{quoted}*"'
+
+
+def _before_keyset(keyset: Tuple[str, int]) -> str:
+    # Keysets come from client cursors: parse and re-serialise both values
+    # so nothing but a timestamp and an integer reaches the filter string.
+    created_at, row_id = datetime.fromisoformat(keyset[0]).isoformat(), int(keyset[1])
+    return f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{row_id})'
+
+
+class SupabaseStorage(TaskStorage):
+    """Tasks stored in the hosted Postgres database through PostgREST."""
+
+    def __init__(self, client: "Client"):
+        self.client = client
+
+    def create_tasks(self, tasks: List[Dict]) -> List[Dict]:
+        query = self.client.table("tasks").insert(tasks)
+        query.params = query.params.add("select", TASK_FIELDS)
+        result = query.execute()
+        if len(result.data) != len(tasks):
+            raise ValueError(f"Expected {len(tasks)} rows, got {len(result.data)}")
+        return result.data
+
+    def get_task(self, task_id: int) -> Optional[Dict]:
+        result = self.client.table("tasks").select(TASK_FIELDS).eq("id", task_id).execute()
+        return result.data[0] if result.data else None
+
+    @staticmethod
+    def _match_args(category, priority, status) -> Dict:
+        # Explicit id lists go through functions that take them in the
+        # request body; in_() would put every id in the URL.
+        return {
+            "match_category": category or None,
+            "match_priority": priority or None,
+            "match_status": status or None,
+        }
+
+    @staticmethod
+    def _matching(query, category, priority, status):
+        if category:
+            query = query.eq("category", category)
+        if priority:
+            query = query.eq("priority", priority)
+        if status:
+            query = query.eq("status", status)
+        return query
+
+    def _filtered(self, query, category, priority, status, search=None, after=None):
+        query = self._matching(query, category, priority, status)
+        # PostgREST takes a single or=() per request, so several
+        # disjunctions are wrapped in one and=().
+        conditions = []
+        if search:
+            pattern = _ilike_pattern(search)
+            conditions.append(f"or(title.ilike.{pattern},description.ilike.{pattern})")
+        if after:
+            conditions.append(f"or({_before_keyset(after)})")
+        if conditions:
+            query.params = query.params.add("and", f"({','.join(conditions)})")
+        return query.order("created_at", desc=True).order("id", desc=True)
+
+    def list_tasks(
+        self,
+        offset: int,
+        limit: int,
+        category: Optional[str] = None,
+        priority: Optional[str] = None,
+        status: Optional[str] = None,
+        search: Optional[str] = None,
+        after: Optional[Tuple[str, int]] = None,
+    ) -> Tuple[List[Dict], int]:
+        # Not imported at module level: postgrest pulls in httpx, which
+        # SQLite deployments never need. By now the client has loaded it.
+        from postgrest.types import CountMethod
+
+        query = self._filtered(
+            self.client.table("tasks").select(TASK_FIELDS, count=CountMethod.estimated),
+            category, priority, status, search, after,
+        )
+        result = query.limit(limit).offset(offset).execute()
+        total = result.count if result.count is not None else offset + len(result.data)
+        return result.data, total
+
+    def scan_tasks(
+        self,
+        limit: int,
+        after: Optional[Tuple[str, int]] = None,
+        category: Optional[str] = None,
+        priority: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> List[Dict]:
+        query = self._filtered(
+            self.client.table("tasks").select(TASK_FIELDS),
+            category, priority, status, after=after,
+        )
+        return query.limit(limit).execute().data
+
+    def search_tasks(self, query: str, offset: int, limit: int) -> Tuple[List[Dict], int]:
+        result = self.client.rpc(
+            "search_tasks",
+            {"search_query": query, "result_limit": limit, "result_offset": offset},
+        ).execute()
+        total = result.data[0]["total"] if result.data else 0
+        return [row["task"] for row in result.data], total
+
+    def count_tasks(self, now: str, due_soon_before: str) -> List[Dict]:
+        return self.client.rpc(
+            "task_counts", {"now_at": now, "due_soon_before": due_soon_before}
+        ).execute().data
+
+    def due_tasks(self, before: str, after: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        query = self.client.table("tasks").select(TASK_FIELDS).neq("status", "completed").lt("due_at", before)
+        if after:
+            query = query.gte("due_at", after)
+        return query.order("due_at").order("id").limit(limit).execute().data
+
+    def list_deadlines(self) -> List[Tuple[int, str]]:
+        # PostgREST caps rows per response, so walk the ids in pages.
+        deadlines = []
+        last_id = 0
+        while True:
+            rows = (
+                self.client.table("tasks").select("id,due_at")
+                .neq("status", "completed").not_.is_("due_at", "null").gt("id", last_id)
+                .order("id").limit(DEADLINE_PAGE_SIZE).execute().data
+            )
+            deadlines.extend((row["id"], row["due_at"]) for row in rows)
+            if len(rows) < DEADLINE_PAGE_SIZE:
+                return deadlines
+            last_id = rows[-1]["id"]
+
+    def list_changes(
+        self, limit: int, after: Optional[Tuple[int, int]] = None
+    ) -> Tuple[List[Dict], List[Dict]]:
+        # One function call, so both streams come from one snapshot.
+        after_xid, after_seq = after or (0, 0)
+        result = self.client.rpc(
+            "task_changes", {"after_xid": after_xid, "after_seq": after_seq, "max_rows": limit}
+        ).execute()
+        return result.data["tasks"], result.data["tombstones"]
+
+    def update_task(self, task_id: int, data: Dict, history: Optional[Dict] = None) -> Optional[Dict]:
+        if history is not None:
+            # PostgREST runs each request in its own transaction, so the
+            # update and its history row go through one function call.
+            result = self.client.rpc(
+                "update_task_with_history",
+                {"target_id": task_id, "changes": data, "history": history},
+            ).execute()
+            return result.data or None
+
+        query = self.client.table("tasks").update(data).eq("id", task_id)
+        query.params = query.params.add("select", TASK_FIELDS)
+        result = query.execute()
+        return result.data[0] if result.data else None
+
+    def update_tasks(
+        self,
+        data: Dict,
+        history: Optional[Dict] = None,
+        ids: Optional[List[int]] = None,
+        category: Optional[str] = None,
+        priority: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> List[Dict]:
+        if ids is not None:
+            params = {"target_ids": ids, "changes": data, **self._match_args(category, priority, status)}
+            updated = self.client.rpc("update_tasks_by_ids", params).execute().data
+        else:
+            query = self._matching(self.client.table("tasks").update(data), category, priority, status)
+            query.params = query.params.add("select", TASK_FIELDS)
+            updated = query.execute().data
+        if updated and history is not None:
+            self.add_history([{**history, "task_id": row["id"]} for row in updated])
+        return updated
+
+    def delete_task(self, task_id: int) -> bool:
+        # task_history rows go with it through ON DELETE CASCADE.
+        return bool(self.delete_tasks(ids=[task_id]))
+
+    def delete_tasks(
+        self,
+        ids: Optional[List[int]] = None,
+        category: Optional[str] = None,
+        priority: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> List[int]:
+        if ids is not None:
+            params = {"target_ids": ids, **self._match_args(category, priority, status)}
+            return self.client.rpc("delete_tasks_by_ids", params).execute().data
+        query = self._matching(self.client.table("tasks").delete(), category, priority, status)
+        query.params = query.params.add("select", "id")
+        return [row["id"] for row in query.execute().data]
+
+    def add_history(self, entries: List[Dict]) -> None:
+        if entries:
+            self.client.table("task_history").insert(entries).execute()
+
+    def list_history(
+        self, task_id: int, limit: int, before: Optional[Tuple[str, int]] = None
+    ) -> List[Dict]:
+        query = self.client.table("task_history").select("*").eq("task_id", task_id)
+        if before:
+            query.params = query.params.add("or", f"({_before_keyset(before)})")
+        return query.order("created_at", desc=True).order("id", desc=True).limit(limit).execute().data
+
+    def scan_history(
+        self, action: str, created_before: str, limit: int, after: Optional[Tuple[int, int]] = None
+    ) -> List[Dict]:
+        query = self.client.table("task_history").select("*").eq("action", action).lt("created_at", created_before)
+        if after:
+            task_id, entry_id = int(after[0]), int(after[1])
+            query.params = query.params.add("or", f"(task_id.gt.{task_id},and(task_id.eq.{task_id},id.gt.{entry_id}))")
+        return query.order("task_id").order("id").limit(limit).execute().data
+
+    def replace_history(self, snapshots: List[Dict], delete_ids: List[int]) -> None:
+        # Two requests: snapshots are written first, so a failure in between
+        # leaves extra entries behind rather than losing any.
+        if snapshots:
+            self.client.table("task_history").upsert(snapshots).execute()
+        if delete_ids:
+            self.client.table("task_history").delete().in_("id", delete_ids).execute()
@@ -0,0 +1,228 @@
+"""Microbenchmarks for the classification, extraction and API hot paths, and cold start.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench --output bench.json
+    python -m benchmarks.bench --baseline bench.json --threshold 0.25
+
+Each benchmark reports the per-operation time in microseconds. With
+``--baseline``, the run fails if any benchmark's best time is more than
+``threshold`` slower than in the baseline file; the minimum over repeats
+is the least noisy estimate on a shared machine.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app import database
+from app import learned_classifier
+from app.analysis import analysis_cache
+from app.classification import KeywordEngine, classify_category, classify_priority
+from app.entity_extraction import extract_dates, extract_people
+from app.models import TaskCreate
+from app.routers.tasks import create_task, get_tasks
+from benchmarks.corpora import long_descriptions, pasted_logs, short_titles
+
+# A setup function prepares its data and returns (operation, ops_per_call).
+Setup = Callable[[], Tuple[Callable[[], None], int]]
+BENCHMARKS: Dict[str, Setup] = {}
+
+
+def benchmark(name: str):
+    def register(setup: Setup) -> Setup:
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def _text_benchmarks(func: Callable[[str], object], label: str) -> None:
+    for corpus_name, corpus in (
+        ("short_titles", short_titles),
+        ("long_descriptions", long_descriptions),
+        ("pasted_logs", pasted_logs),
+    ):
+        def setup(corpus=corpus):
+            texts = corpus()
+            return (lambda: [func(text) for text in texts]), len(texts)
+        benchmark(f"{label}/{corpus_name}")(setup)
+
+
+_text_benchmarks(classify_category, "classify_category")
+_text_benchmarks(classify_priority, "classify_priority")
+_text_benchmarks(extract_dates, "extract_dates")
+_text_benchmarks(extract_people, "extract_people")
+
+
+def _engine_benchmark(build_engine: Callable[[List[str]], object]) -> Setup:
+    def setup():
+        texts = long_descriptions(1000, sentences=3)
+        engine = build_engine(texts)
+        return (lambda: engine.classify(texts)), len(texts)
+    return setup
+
+
+def _learned_engine(texts: List[str]):
+    # Trained to imitate the keyword engine; only the speed matters here.
+    labels = KeywordEngine().classify(texts)
+    examples = [(text, category, priority, 1.0) for text, (category, priority) in zip(texts, labels)]
+    return learned_classifier.LearnedEngine(learned_classifier.train(examples))
+
+
+benchmark("classify_batch/keyword")(_engine_benchmark(lambda texts: KeywordEngine()))
+if learned_classifier.np is not None:
+    benchmark("classify_batch/learned")(_engine_benchmark(_learned_engine))
+
+
+def _fresh_storage():
+    os.environ.update({"DB_BACKEND": "sqlite", "SQLITE_PATH": ":memory:", "CACHE_BACKEND": "none"})
+    database.close_db()
+    database.init_db()
+
+
+def _task_payloads(count: int) -> List[TaskCreate]:
+    titles = short_titles(count)
+    descriptions = long_descriptions(count, sentences=3)
+    return [
+        TaskCreate(title=title, description=description)
+        for title, description in zip(titles, descriptions)
+    ]
+
+
+@benchmark("api/create_task")
+def _create_task():
+    loop = asyncio.new_event_loop()
+    _fresh_storage()
+    payloads = _task_payloads(100)
+
+    async def create_all():
+        # Repeats reuse the payloads; without this every timed run would be
+        # served from the analysis cache filled by the warm-up.
+        analysis_cache.clear()
+        for payload in payloads:
+            await create_task(payload)
+
+    return (lambda: loop.run_until_complete(create_all())), len(payloads)
+
+
+def _list_benchmark(**filters):
+    def setup():
+        loop = asyncio.new_event_loop()
+        _fresh_storage()
+        database.get_storage().create_tasks([
+            {**payload.model_dump(), "category": "general", "priority": "medium",
+             "status": "pending" if i % 3 else "completed",
+             "extracted_entities": {"dates": [], "people": []}, "suggested_actions": [],
+             "created_at": f"2024-01-01T00:00:{i // 1000:02d}.{i % 1000:06d}",
+             "updated_at": "2024-01-01T00:00:00"}
+            for i, payload in enumerate(_task_payloads(2000))
+        ])
+        params = {"page": 1, "page_size": 20, "category": None, "priority": None,
+                  "status": None, "search": None, "cursor": None,
+                  "if_none_match": None, **filters}
+        calls = 20
+
+        async def list_pages():
+            for _ in range(calls):
+                await get_tasks(**params)
+
+        return (lambda: loop.run_until_complete(list_pages())), calls
+    return setup
+
+
+benchmark("api/get_tasks/first_page")(_list_benchmark())
+benchmark("api/get_tasks/status_filter")(_list_benchmark(status="pending"))
+benchmark("api/get_tasks/deep_page")(_list_benchmark(page=90))
+benchmark("api/get_tasks/search")(_list_benchmark(search="invoice"))
+
+
+@benchmark("startup/import_app")
+def _import_app():
+    # A fresh interpreter each time, as on a scale-to-zero cold start.
+    command = [sys.executable, "-c", "import app.main"]
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return (lambda: subprocess.run(command, cwd=backend, check=True)), 1
+
+
+def run(selected: Optional[str] = None, repeat: int = 5) -> Dict[str, Dict]:
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if selected and selected not in name:
+            continue
+
+        operation, ops = setup()
+        operation()  # warm caches and lazily compiled patterns
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            operation()
+            samples.append((time.perf_counter() - start) / ops * 1e6)
+
+        results[name] = {
+            "ops": ops,
+            "repeat": repeat,
+            "min_us": round(min(samples), 3),
+            "median_us": round(statistics.median(samples), 3),
+        }
+        print(f"{name:45s} {results[name]['median_us']:12.1f} us/op", file=sys.stderr)
+
+    database.close_db()
+    return results
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        limit = previous["min_us"] * (1 + threshold)
+        if result["min_us"] > limit:
+            regressions.append(
+                f"{name}: {result['min_us']:.1f} us/op vs baseline "
+                f"{previous['min_us']:.1f} us/op (+{threshold:.0%} allowed)"
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--baseline", help="fail on regressions against this results file")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown, e.g. 0.25 = 25%%")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this text")
+    args = parser.parse_args(argv)
+
+    results = run(args.filter, args.repeat)
+    report = {
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
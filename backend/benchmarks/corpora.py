@@ -0,0 +1,80 @@
+import random
+from typing import List
+
+SEED = 1234
+
+TITLE_TEMPLATES = [
+    "Schedule meeting with {person}",
+    "Pay {vendor} invoice",
+    "Fix {component} bug",
+    "Deploy {component} to staging",
+    "Quarterly safety inspection",
+    "Review budget for {team}",
+    "Book flights for conference",
+    "Urgent: {component} outage",
+    "Update compliance training",
+    "Call {person} about refund",
+    "Buy groceries",
+    "Plan team offsite",
+]
+
+PEOPLE = ["John", "Sarah Connor", "Priya", "Mateo", "Alice Smith", "Wei", "Fatima"]
+VENDORS = ["AWS", "electricity", "catering", "legal", "office supplies"]
+COMPONENTS = ["login", "payments API", "database", "search", "mobile app", "auth server"]
+TEAMS = ["marketing", "platform", "finance", "support"]
+
+SENTENCES = [
+    "Need to coordinate with {person} before the deadline on {date}.",
+    "The {component} has been failing intermittently since {date}, please debug.",
+    "Make sure the invoice is processed and the payment recorded by {date}.",
+    "This is optional and can be done later when possible.",
+    "Critical: customers are blocked, must be fixed ASAP.",
+    "Meet {person} at {time} to review the audit findings.",
+    "Assigned to {person}; follow up tomorrow if there is no progress.",
+    "Budget for {team} needs to be finalised next week.",
+    "Nothing special here, just a regular task to keep track of.",
+]
+
+DATES = ["12/25/2024", "2024-03-15", "Jan 5, 2025", "14 February 2025", "3/7/25"]
+TIMES = ["10:30 AM", "14:00", "9:15 pm"]
+
+
+def _fill(template: str, rng: random.Random) -> str:
+    return template.format(
+        person=rng.choice(PEOPLE),
+        vendor=rng.choice(VENDORS),
+        component=rng.choice(COMPONENTS),
+        team=rng.choice(TEAMS),
+        date=rng.choice(DATES),
+        time=rng.choice(TIMES),
+    )
+
+
+def short_titles(count: int = 200) -> List[str]:
+    rng = random.Random(SEED)
+    return [_fill(rng.choice(TITLE_TEMPLATES), rng) for _ in range(count)]
+
+
+def long_descriptions(count: int = 50, sentences: int = 40) -> List[str]:
+    rng = random.Random(SEED + 1)
+    return [
+        " ".join(_fill(rng.choice(SENTENCES), rng) for _ in range(sentences))
+        for _ in range(count)
+    ]
+
+
+def pasted_logs(count: int = 5, lines: int = 400) -> List[str]:
+    rng = random.Random(SEED + 2)
+    logs = []
+    for _ in range(count):
+        log_lines = []
+        for i in range(lines):
+            log_lines.append(
+                f"2024-0{rng.randint(1, 9)}-{rng.randint(10, 28)} {rng.randint(0, 23):02d}:"
+                f"{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d} "
+                f"{rng.choice(['INFO', 'WARN', 'ERROR'])} worker-{rng.randint(1, 64)} "
+                f"request id={rng.randint(10000, 99999)} status={rng.choice([200, 404, 500])} "
+                f"latency={rng.randint(1, 900)}ms"
+            )
+        logs.append("\n".join(log_lines))
+    return logs
@@ -1,3 +1,4 @@
+import argparse
 import uvicorn
 import os
 from pathlib import Path
@@ -7,12 +8,21 @@ env_path = Path(__file__).parent / ".env"
 load_dotenv(dotenv_path=env_path)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the Task Scheduler API.")
+    parser.add_argument(
+        "--production", action="store_true",
+        help="no auto-reload: serve from this process as soon as the app is imported",
+    )
+    args = parser.parse_args()
+
     host = os.getenv("HOST", "0.0.0.0")
     port = int(os.getenv("PORT", 8000))
     
+    # The reloader starts a watcher process that imports the app again in a
+    # child, which roughly doubles cold start time; keep it for development.
     uvicorn.run(
         "app.main:app",
         host=host,
         port=port,
-        reload=True
+        reload=not args.production
     )
@@ -27,3 +27,225 @@ CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks(priority);
 CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
 CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON tasks(created_at);
 CREATE INDEX IF NOT EXISTS idx_task_history_task_id ON task_history(task_id);
+
+-- Full-text search over title and description
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_tasks_search_vector ON tasks USING GIN (search_vector);
+
+-- Trigram indexes back the substring ?search= filter on GET /api/tasks
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_tasks_title_trgm ON tasks USING GIN (title gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_tasks_description_trgm ON tasks USING GIN (description gin_trgm_ops);
+
+CREATE OR REPLACE FUNCTION search_tasks(search_query TEXT, result_limit INT DEFAULT 10, result_offset INT DEFAULT 0)
+RETURNS TABLE (task JSONB, rank REAL, total BIGINT)
+LANGUAGE sql STABLE AS $$
+    SELECT to_jsonb(t) - 'search_vector', ts_rank_cd(t.search_vector, q), COUNT(*) OVER ()
+    FROM tasks t, websearch_to_tsquery('english', search_query) q
+    WHERE t.search_vector @@ q
+    ORDER BY ts_rank_cd(t.search_vector, q) DESC, t.id DESC
+    LIMIT result_limit OFFSET result_offset;
+$$;
+
+-- PATCH /api/tasks/{id}: update a task and record its history in one call.
+-- Keys missing from `changes` keep their current values. Returns NULL when
+-- no task has this id.
+CREATE OR REPLACE FUNCTION update_task_with_history(target_id BIGINT, changes JSONB, history JSONB)
+RETURNS JSONB
+LANGUAGE plpgsql AS $$
+DECLARE
+    updated tasks;
+BEGIN
+    UPDATE tasks t SET
+        (title, description, category, priority, status, due_date, due_at, assigned_to,
+         extracted_entities, suggested_actions, updated_at) =
+        (SELECT r.title, r.description, r.category, r.priority, r.status, r.due_date, r.due_at, r.assigned_to,
+                r.extracted_entities, r.suggested_actions, r.updated_at
+         FROM jsonb_populate_record(t, changes) r)
+    WHERE t.id = target_id
+    RETURNING t.* INTO updated;
+
+    IF NOT FOUND THEN
+        RETURN NULL;
+    END IF;
+
+    INSERT INTO task_history (task_id, action, changed_by, changes, created_at)
+    VALUES (
+        target_id,
+        history->>'action',
+        history->>'changed_by',
+        COALESCE(history->'changes', '{}'),
+        COALESCE((history->>'created_at')::TIMESTAMPTZ, NOW())
+    );
+
+    RETURN to_jsonb(updated) - 'search_vector';
+END;
+$$;
+
+-- PATCH /api/tasks/bulk and DELETE /api/tasks with explicit ids. The ids
+-- travel in the request body rather than the URL, which could not hold
+-- thousands of them. NULL filters match any value.
+CREATE OR REPLACE FUNCTION update_tasks_by_ids(
+    target_ids BIGINT[], changes JSONB,
+    match_category VARCHAR DEFAULT NULL, match_priority VARCHAR DEFAULT NULL, match_status VARCHAR DEFAULT NULL
+)
+RETURNS SETOF JSONB
+LANGUAGE sql AS $$
+    UPDATE tasks t SET
+        (title, description, category, priority, status, due_date, due_at, assigned_to,
+         extracted_entities, suggested_actions, updated_at) =
+        (SELECT r.title, r.description, r.category, r.priority, r.status, r.due_date, r.due_at, r.assigned_to,
+                r.extracted_entities, r.suggested_actions, r.updated_at
+         FROM jsonb_populate_record(t, changes) r)
+    WHERE t.id = ANY(target_ids)
+      AND (match_category IS NULL OR t.category = match_category)
+      AND (match_priority IS NULL OR t.priority = match_priority)
+      AND (match_status IS NULL OR t.status = match_status)
+    RETURNING to_jsonb(t) - 'search_vector';
+$$;
+
+CREATE OR REPLACE FUNCTION delete_tasks_by_ids(
+    target_ids BIGINT[],
+    match_category VARCHAR DEFAULT NULL, match_priority VARCHAR DEFAULT NULL, match_status VARCHAR DEFAULT NULL
+)
+RETURNS SETOF BIGINT
+LANGUAGE sql AS $$
+    DELETE FROM tasks t
+    WHERE t.id = ANY(target_ids)
+      AND (match_category IS NULL OR t.category = match_category)
+      AND (match_priority IS NULL OR t.priority = match_priority)
+      AND (match_status IS NULL OR t.status = match_status)
+    RETURNING t.id;
+$$;
+
+-- Due dates normalised to timestamps. due_at is filled from due_date, or
+-- from dates found in the task text, by the API; existing ISO due dates
+-- are backfilled here. A value that only looks like a date (2024-13-45)
+-- is left NULL instead of failing the migration.
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS due_at TIMESTAMP WITH TIME ZONE;
+CREATE OR REPLACE FUNCTION safe_timestamptz(value TEXT)
+RETURNS TIMESTAMPTZ
+LANGUAGE plpgsql STABLE AS $$
+BEGIN
+    RETURN value::TIMESTAMPTZ;
+EXCEPTION WHEN others THEN
+    RETURN NULL;
+END;
+$$;
+UPDATE tasks SET due_at = safe_timestamptz(due_date)
+WHERE due_at IS NULL AND due_date ~ '^\d{4}-\d{2}-\d{2}';
+CREATE INDEX IF NOT EXISTS idx_tasks_due_at ON tasks(due_at) WHERE status <> 'completed';
+
+-- GET /api/tasks/stats: task counts per (category, priority, status), with
+-- unfinished tasks that are overdue or due soon.
+CREATE OR REPLACE FUNCTION task_counts(now_at TIMESTAMPTZ, due_soon_before TIMESTAMPTZ)
+RETURNS TABLE (category VARCHAR, priority VARCHAR, status VARCHAR, count BIGINT, overdue BIGINT, due_soon BIGINT)
+LANGUAGE sql STABLE AS $$
+    SELECT t.category, t.priority, t.status, COUNT(*),
+           COUNT(*) FILTER (WHERE t.status <> 'completed' AND t.due_at < now_at),
+           COUNT(*) FILTER (WHERE t.status <> 'completed' AND t.due_at >= now_at AND t.due_at < due_soon_before)
+    FROM tasks t
+    GROUP BY t.category, t.priority, t.status;
+$$;
+
+-- GET /api/tasks/changes: delta sync. Every insert, update and delete is
+-- stamped with its transaction id and the next value of one sequence, and a
+-- trigger leaves a tombstone for every deleted task, however it was deleted.
+-- Sequence values are handed out in call order, not commit order, so the
+-- feed pages on (change_xid, change_seq) and only returns changes from
+-- transactions older than every one still in flight; anything that commits
+-- later has a larger transaction id and lands after the cursor.
+CREATE SEQUENCE IF NOT EXISTS task_change_seq;
+
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS change_xid XID8;
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS change_seq BIGINT;
+
+CREATE OR REPLACE FUNCTION bump_task_change_seq()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    -- Take the transaction id first, so it is assigned before the sequence value.
+    NEW.change_xid := pg_current_xact_id();
+    NEW.change_seq := nextval('task_change_seq');
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS tasks_change_seq ON tasks;
+CREATE TRIGGER tasks_change_seq BEFORE INSERT OR UPDATE ON tasks
+    FOR EACH ROW EXECUTE FUNCTION bump_task_change_seq();
+
+-- Number rows from before change_seq: the trigger fills it in on this update.
+UPDATE tasks SET change_seq = NULL WHERE change_seq IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_tasks_change ON tasks(change_xid, change_seq);
+
+CREATE TABLE IF NOT EXISTS task_tombstones (
+    task_id BIGINT PRIMARY KEY,
+    deleted_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    change_xid XID8 NOT NULL DEFAULT pg_current_xact_id(),
+    change_seq BIGINT NOT NULL DEFAULT nextval('task_change_seq')
+);
+
+CREATE INDEX IF NOT EXISTS idx_task_tombstones_change ON task_tombstones(change_xid, change_seq);
+
+CREATE OR REPLACE FUNCTION record_task_tombstone()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO task_tombstones (task_id) VALUES (OLD.id) ON CONFLICT (task_id) DO NOTHING;
+    RETURN OLD;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS tasks_tombstone ON tasks;
+CREATE TRIGGER tasks_tombstone AFTER DELETE ON tasks
+    FOR EACH ROW EXECUTE FUNCTION record_task_tombstone();
+
+-- Both streams are read in one statement, so they come from one snapshot.
+CREATE OR REPLACE FUNCTION task_changes(after_xid BIGINT, after_seq BIGINT, max_rows INT)
+RETURNS JSONB
+LANGUAGE sql STABLE AS $$
+    WITH horizon AS (
+        SELECT pg_snapshot_xmin(pg_current_snapshot()) AS xmin, after_xid::TEXT::XID8 AS after_xid
+    )
+    SELECT jsonb_build_object(
+        'tasks', COALESCE((
+            SELECT jsonb_agg(
+                to_jsonb(t) - 'search_vector' || jsonb_build_object('change_xid', t.change_xid::TEXT::BIGINT)
+                ORDER BY t.change_xid, t.change_seq
+            )
+            FROM (
+                SELECT tasks.* FROM tasks, horizon
+                WHERE tasks.change_xid < horizon.xmin
+                  AND (tasks.change_xid, tasks.change_seq) > (horizon.after_xid, after_seq)
+                ORDER BY tasks.change_xid, tasks.change_seq
+                LIMIT max_rows
+            ) t
+        ), '[]'::JSONB),
+        'tombstones', COALESCE((
+            SELECT jsonb_agg(
+                jsonb_build_object(
+                    'id', d.task_id, 'deleted_at', d.deleted_at,
+                    'change_xid', d.change_xid::TEXT::BIGINT, 'change_seq', d.change_seq
+                )
+                ORDER BY d.change_xid, d.change_seq
+            )
+            FROM (
+                SELECT task_tombstones.* FROM task_tombstones, horizon
+                WHERE task_tombstones.change_xid < horizon.xmin
+                  AND (task_tombstones.change_xid, task_tombstones.change_seq) > (horizon.after_xid, after_seq)
+                ORDER BY task_tombstones.change_xid, task_tombstones.change_seq
+                LIMIT max_rows
+            ) d
+        ), '[]'::JSONB)
+    );
+$$;
+
+-- GET /api/tasks/{id}/history: one task's entries, newest first
+CREATE INDEX IF NOT EXISTS idx_task_history_task_created ON task_history(task_id, created_at, id);
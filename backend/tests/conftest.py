@@ -0,0 +1,21 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app import database
+from app.main import app
+from app.storage import SQLiteStorage
+
+
+@pytest.fixture
+def storage():
+    storage = SQLiteStorage(":memory:")
+    yield storage
+    storage.close()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("DB_BACKEND", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", ":memory:")
+    with TestClient(app) as client:
+        yield client
@@ -0,0 +1,101 @@
+import asyncio
+import pytest
+from app.admission import AdmissionController, AdmissionMiddleware, RouteClass, route_class
+
+def controller(max_concurrency=1, max_queue=2, queue_timeout=1.0):
+    classes = [
+        RouteClass("write", 0, max_concurrency, max_queue, queue_timeout),
+        RouteClass("read", 1, max_concurrency, max_queue, queue_timeout),
+        RouteClass("bulk", 2, max_concurrency, max_queue, queue_timeout, 429),
+    ]
+    return AdmissionController({route.name: route for route in classes}, max_concurrency)
+
+class TestRouteClass:
+    def test_requests_are_classified_by_method_and_path(self):
+        assert route_class("GET", "/api/tasks") == "bulk"
+        assert route_class("GET", "/api/tasks/") == "bulk"
+        assert route_class("POST", "/api/classify") == "bulk"
+        assert route_class("POST", "/api/tasks/bulk") == "bulk"
+        assert route_class("PATCH", "/api/tasks/bulk") == "bulk"
+        assert route_class("DELETE", "/api/tasks") == "bulk"
+        assert route_class("DELETE", "/api/tasks/7") == "write"
+        assert route_class("GET", "/api/tasks/7") == "read"
+        assert route_class("PATCH", "/api/tasks/7") == "write"
+        assert route_class("POST", "/api/tasks") == "write"
+    
+    def test_non_api_paths_are_never_limited(self):
+        assert route_class("GET", "/health") is None
+        assert route_class("GET", "/metrics") is None
+
+class TestAdmissionController:
+    def test_full_queue_is_rejected_at_once(self):
+        async def scenario():
+            admission = controller(max_queue=1)
+            assert await admission.acquire("read") is None
+            waiter = asyncio.create_task(admission.acquire("read"))
+            await asyncio.sleep(0)
+            assert admission.queue_depth("read") == 1
+            assert await admission.acquire("read") == "queue_full"
+            admission.release("read")
+            assert await waiter is None
+            admission.release("read")
+            assert admission.in_flight == 0
+        
+        asyncio.run(scenario())
+    
+    def test_waiter_gives_up_at_its_deadline(self):
+        async def scenario():
+            admission = controller(queue_timeout=0.01)
+            assert await admission.acquire("write") is None
+            assert await admission.acquire("write") == "timeout"
+            assert admission.queue_depth("write") == 0
+            admission.release("write")
+            assert admission.in_flight == 0
+        
+        asyncio.run(scenario())
+    
+    def test_writes_are_admitted_before_bulk_reads(self):
+        async def scenario():
+            admission = controller()
+            order = []
+            
+            async def request(name):
+                assert await admission.acquire(name) is None
+                order.append(name)
+                admission.release(name)
+            
+            assert await admission.acquire("read") is None
+            bulk = asyncio.create_task(request("bulk"))
+            await asyncio.sleep(0)
+            write = asyncio.create_task(request("write"))
+            await asyncio.sleep(0)
+            admission.release("read")
+            await asyncio.gather(bulk, write)
+            assert order == ["write", "bulk"]
+        
+        asyncio.run(scenario())
+
+class TestAdmissionMiddleware:
+    def test_saturated_route_class_is_shed_with_retry_after(self):
+        admission = controller(max_queue=0)
+        sent = []
+        
+        async def app(scope, receive, send):
+            sent.append("handled")
+        
+        async def send(message):
+            sent.append(message)
+        
+        async def scenario():
+            middleware = AdmissionMiddleware(app, admission)
+            assert await admission.acquire("bulk") is None
+            await middleware({"type": "http", "method": "GET", "path": "/api/tasks", "headers": []}, None, send)
+            admission.release("bulk")
+            await middleware({"type": "http", "method": "GET", "path": "/api/tasks", "headers": []}, None, send)
+        
+        asyncio.run(scenario())
+        start = sent[0]
+        assert start["status"] == 429
+        assert (b"retry-after", b"1") in start["headers"]
+        assert sent[-1] == "handled"
+        assert admission.in_flight == 0
@@ -0,0 +1,39 @@
+import json
+import pytest
+from app.analysis import analysis_cache
+from benchmarks import bench
+
+class TestBenchmarkHarness:
+    def test_run_reports_per_op_times(self):
+        results = bench.run("extract_people/short_titles", repeat=1)
+        assert list(results) == ["extract_people/short_titles"]
+        assert results["extract_people/short_titles"]["min_us"] > 0
+    
+    def test_create_task_benchmark_analyses_every_run(self, monkeypatch):
+        # The benchmark points the app at a fresh in-memory database; put
+        # the settings back for the tests after this one.
+        for name in ("DB_BACKEND", "SQLITE_PATH", "CACHE_BACKEND"):
+            monkeypatch.setenv(name, "")
+        misses = analysis_cache.misses
+        bench.run("api/create_task", repeat=1)
+        # The warm-up and the timed run both miss on all 100 payloads
+        assert analysis_cache.misses - misses == 200
+    
+    def test_compare_flags_only_regressions_beyond_threshold(self):
+        baseline = {"a": {"min_us": 10.0}, "b": {"min_us": 10.0}}
+        results = {"a": {"min_us": 12.0}, "b": {"min_us": 13.0}, "new": {"min_us": 1.0}}
+        regressions = bench.compare(results, baseline, threshold=0.25)
+        assert len(regressions) == 1
+        assert regressions[0].startswith("b:")
+    
+    def test_main_fails_against_faster_baseline(self, tmp_path):
+        baseline = tmp_path / "baseline.json"
+        baseline.write_text(json.dumps({"results": {"classify_priority/short_titles": {"min_us": 0.0001}}}))
+        output = tmp_path / "results.json"
+        
+        code = bench.main([
+            "--filter", "classify_priority/short_titles", "--repeat", "1",
+            "--output", str(output), "--baseline", str(baseline),
+        ])
+        assert code == 1
+        assert "classify_priority/short_titles" in json.loads(output.read_text())["results"]
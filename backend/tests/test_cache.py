@@ -0,0 +1,53 @@
+import time
+import pytest
+from app.cache import LocalCacheBackend, TaskCache
+
+class TestLocalCacheBackend:
+    def test_evicts_least_recently_used(self):
+        backend = LocalCacheBackend(max_entries=2, ttl=60)
+        backend.set("a", 1)
+        backend.set("b", 2)
+        backend.get("a")
+        backend.set("c", 3)
+        
+        assert backend.get("a") == 1
+        assert backend.get("b") is None
+        assert backend.evictions == 1
+    
+    def test_entries_expire_after_ttl(self):
+        backend = LocalCacheBackend(max_entries=10, ttl=0.01)
+        backend.set("a", 1)
+        time.sleep(0.02)
+        assert backend.get("a") is None
+
+class TestTaskCache:
+    def test_invalidation_only_touches_matching_lists(self):
+        cache = TaskCache(LocalCacheBackend())
+        finance = ("finance", None, None)
+        technical = ("technical", None, None)
+        for filters in (finance, technical):
+            cache.set_list(cache.list_key(filters, 0, 10), [], 0)
+        
+        cache.invalidate_tasks([{"id": 1, "category": "finance", "priority": "high", "status": "pending"}])
+        
+        assert cache.get_list(cache.list_key(finance, 0, 10)) is None
+        assert cache.get_list(cache.list_key(technical, 0, 10)) == ([], 0)
+    
+    def test_unknown_previous_row_invalidates_all_lists(self):
+        cache = TaskCache(LocalCacheBackend())
+        cache.set_list(cache.list_key(("technical", None, None), 0, 10), [], 0)
+        cache.invalidate_task_id(1)
+        assert cache.get_list(cache.list_key(("technical", None, None), 0, 10)) is None
+    
+    def test_task_read_before_a_write_is_not_served_after_it(self):
+        cache = TaskCache(LocalCacheBackend())
+        stale = {"id": 1, "title": "old", "category": "general", "priority": "low", "status": "pending"}
+        
+        # A reader misses and fetches the old row; a write invalidates before
+        # the reader stores what it fetched.
+        key = cache.task_key(1)
+        assert cache.get_task(key) is None
+        cache.invalidate_tasks([{**stale, "title": "new"}])
+        cache.set_task(key, stale)
+        
+        assert cache.get_task(cache.task_key(1)) is None
@@ -1,5 +1,5 @@
 import pytest
-from app.classification import classify_task
+from app.classification import classify_task, classify_category, classify_priority
 
 class TestCategoryClassification:
     def test_scheduling_category(self):
@@ -76,3 +76,17 @@ class TestSuggestedActions:
         )
         assert result["category"] == "finance"
         assert len(result["suggested_actions"]) > 0
+
+class TestKeywordMatching:
+    def test_overlapping_keywords_all_count(self):
+        # "safety check" also contains "safety"; "debugging" contains "debug" and "bug"
+        assert classify_category("Safety check before the meeting") == "safety"
+        assert classify_category("debugging the calendar") == "technical"
+    
+    def test_keyword_straddling_previous_match(self):
+        # "codevelop" hides "develop" behind the "code" match
+        assert classify_category("codevelop the schedule") == "technical"
+    
+    def test_matching_is_case_insensitive(self):
+        assert classify_priority("NICE TO HAVE") == "low"
+        assert classify_priority("Nice to have, but URGENT") == "high"
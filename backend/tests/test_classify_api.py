@@ -0,0 +1,56 @@
+import asyncio
+import pytest
+from app import analysis
+from app.analysis import analyze_task, analyze_task_async
+
+class TestAnalyzeTask:
+    def test_repeated_text_is_served_from_cache(self):
+        first, first_cached = analyze_task("Pay   invoice", "Billing due 1/2/2030")
+        second, second_cached = analyze_task("Pay invoice", "Billing  due 1/2/2030")
+        assert not first_cached
+        assert second_cached
+        assert first == second
+    
+    def test_cached_result_is_not_shared(self):
+        first, _ = analyze_task("Copy check", "Meet Alice")
+        first["entities"]["people"].append("Mallory")
+        second, _ = analyze_task("Copy check", "Meet Alice")
+        assert "Mallory" not in second["entities"]["people"]
+    
+    def test_large_text_is_analysed_in_worker_process(self, monkeypatch):
+        monkeypatch.setattr(analysis, "OFFLOAD_MIN_CHARS", 10)
+        try:
+            result, cached = asyncio.run(analyze_task_async("Fix bug", "Urgent server crash, contact Bob"))
+        finally:
+            analysis.close_analysis_executor()
+        assert not cached
+        assert result == analyze_task("Fix bug", "Urgent server crash, contact Bob")[0]
+        assert analysis.analysis_runs.value("offloaded", "complete") >= 1
+    
+    def test_partial_result_is_not_cached(self, monkeypatch):
+        monkeypatch.setattr(analysis, "OFFLOAD_MIN_CHARS", 10)
+        monkeypatch.setattr(analysis, "ANALYSIS_TIME_BUDGET", -1.0)
+        description = "call Carol about the outage " * 3000
+        try:
+            result, _ = asyncio.run(analyze_task_async("Outage", description))
+        finally:
+            analysis.close_analysis_executor()
+        assert result["entities"]["partial"] is True
+        assert analysis.analysis_cache.get(analysis._cache_key("Outage", " ".join(description.split()))) is None
+
+class TestClassifyApi:
+    def test_classifies_every_item(self, client):
+        response = client.post("/api/classify", json=[
+            {"title": "Fix bug", "description": "Urgent server crash"},
+            {"title": "Team lunch"},
+            {"title": "Fix bug", "description": "Urgent server crash"},
+        ])
+        assert response.status_code == 200
+        body = response.json()
+        assert [result["category"] for result in body["results"]] == ["technical", "general", "technical"]
+        assert body["results"][0]["priority"] == "high"
+        assert body["cache_hits"] >= 1
+        assert 0 < body["cache_hit_ratio"] <= 1
+    
+    def test_rejects_empty_batch(self, client):
+        assert client.post("/api/classify", json=[]).status_code == 422
@@ -0,0 +1,101 @@
+import asyncio
+import pytest
+from datetime import datetime, timedelta, timezone
+from app.deadlines import DeadlineScheduler, normalise_due_date, resolve_due_at
+
+NOW = datetime(2030, 6, 15, 12, 0)
+
+def iso_in(seconds):
+    moment = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(seconds=seconds)
+    return moment.isoformat(timespec="seconds")
+
+class TestResolveDueAt:
+    def test_explicit_due_date_wins(self):
+        assert resolve_due_at("2030-07-01", ["2030-06-20"], NOW) == "2030-07-01T00:00:00"
+        assert normalise_due_date("2030-07-01T09:30:00+02:00") == "2030-07-01T07:30:00"
+    
+    def test_falls_back_to_earliest_upcoming_text_date(self):
+        dates = ["2030-06-01", "2030-06-20", "2030-06-18", "6/18/2030"]
+        assert resolve_due_at(None, dates, NOW) == "2030-06-18T00:00:00"
+        assert resolve_due_at("someday", ["tomorrow"], NOW) == "2030-06-16T00:00:00"
+    
+    def test_past_dates_are_kept_when_nothing_is_upcoming(self):
+        assert resolve_due_at(None, ["2030-01-01", "2030-03-01"], NOW) == "2030-03-01T00:00:00"
+        assert resolve_due_at(None, ["10:30 AM"], NOW) is None
+
+class TestDeadlineScheduler:
+    def test_pops_reminders_then_escalations_in_order(self):
+        scheduler = DeadlineScheduler(reminder_lead=60)
+        scheduler.schedule_many([(1, iso_in(200)), (2, iso_in(100)), (3, iso_in(-10))])
+        assert len(scheduler) == 2
+        
+        now = datetime.now(timezone.utc).timestamp()
+        assert [event[:2] for event in scheduler.pop_due(now + 50)] == [("reminder", 2)]
+        assert [event[:2] for event in scheduler.pop_due(now + 300)] == [
+            ("escalation", 2), ("reminder", 1), ("escalation", 1)
+        ]
+        assert len(scheduler) == 0
+    
+    def test_rescheduled_and_cancelled_deadlines_do_not_fire(self):
+        scheduler = DeadlineScheduler(reminder_lead=0)
+        scheduler.schedule(1, iso_in(100))
+        later = iso_in(1000)
+        scheduler.schedule(1, later)
+        scheduler.schedule(2, iso_in(100))
+        scheduler.cancel(2)
+        
+        now = datetime.now(timezone.utc).timestamp()
+        assert scheduler.pop_due(now + 500) == []
+        assert scheduler.pop_due(now + 2000) == [("escalation", 1, later)]
+    
+    def test_moving_back_to_an_earlier_time_fires_once(self):
+        scheduler = DeadlineScheduler(reminder_lead=60)
+        first, second = iso_in(100), iso_in(200)
+        scheduler.schedule(1, first)
+        scheduler.schedule(1, second)
+        scheduler.schedule(1, first)
+        scheduler.cancel(2)
+        scheduler.schedule(2, first)
+        scheduler.cancel(2)
+        scheduler.schedule(2, first)
+        
+        now = datetime.now(timezone.utc).timestamp()
+        assert scheduler.pop_due(now + 500) == [
+            ("reminder", 1, first), ("reminder", 2, first),
+            ("escalation", 1, first), ("escalation", 2, first),
+        ]
+    
+    def test_restore_keeps_changes_made_while_loading(self):
+        async def scenario():
+            scheduler = DeadlineScheduler(reminder_lead=0)
+            scheduler.start(restoring=True)
+            newer = iso_in(500)
+            scheduler.schedule(1, newer)
+            scheduler.cancel(2)
+            scheduler.restore([(1, iso_in(100)), (2, iso_in(100)), (3, iso_in(100))])
+            await scheduler.stop()
+            return newer, {task_id: due_at for task_id, (_, due_at) in scheduler._deadlines.items()}
+        
+        newer, deadlines = asyncio.run(scenario())
+        assert deadlines[1] == newer
+        assert sorted(deadlines) == [1, 3]
+    
+    def test_background_task_fires_hooks(self):
+        fired = []
+        
+        async def scenario():
+            scheduler = DeadlineScheduler(reminder_lead=0.05)
+            scheduler.add_hook("reminder", lambda task_id, due_at: fired.append(("reminder", task_id)))
+            
+            async def escalate(task_id, due_at):
+                fired.append(("escalation", task_id))
+            scheduler.add_hook("escalation", escalate)
+            
+            scheduler.start()
+            due = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(seconds=0.2)
+            scheduler.schedule(7, due.isoformat())
+            await asyncio.sleep(0.4)
+            await scheduler.stop()
+        
+        asyncio.run(scenario())
+        assert fired == [("reminder", 7), ("escalation", 7)]
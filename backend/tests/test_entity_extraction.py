@@ -0,0 +1,60 @@
+import pytest
+from app import entity_extraction
+from app.entity_extraction import extract_dates, extract_entities
+
+class TestDateExtraction:
+    def test_absolute_dates_are_normalised(self):
+        dates = extract_dates("Submit report by Jan 5, 2024 and review on 12/25/2024")
+        assert "Jan 5, 2024" in dates
+        assert "2024-01-05" in dates
+        assert "12/25/2024" in dates
+        assert "2024-12-25" in dates
+    
+    def test_iso_date_is_not_split(self):
+        assert extract_dates("Release on 2024-01-15") == ["2024-01-15"]
+    
+    def test_relative_dates_and_times_are_kept_as_written(self):
+        dates = extract_dates("Call tomorrow at 10:30 AM")
+        assert dates == ["10:30 AM", "tomorrow"]
+    
+    def test_results_are_sorted_and_unique(self):
+        dates = extract_dates("2024-03-01, 2024-01-01 and again 2024-03-01")
+        assert dates == ["2024-01-01", "2024-03-01"]
+    
+    def test_numbers_without_dates_are_ignored(self):
+        assert extract_dates("worker-7 processed request id=7919 status=200") == []
+    
+    def test_parse_attempts_are_capped(self, monkeypatch):
+        monkeypatch.setattr(entity_extraction, "MAX_DATE_PARSES", 2)
+        entity_extraction._normalise_date.cache_clear()
+        dates = extract_dates("1/1/2024 1/2/2024 1/3/2024")
+        assert dates == ["1/1/2024", "1/2/2024", "1/3/2024", "2024-01-01", "2024-01-02"]
+    
+    def test_invalid_date_keeps_raw_text(self):
+        assert extract_dates("due 13/45/2024") == ["13/45/2024"]
+
+class TestEntityExtraction:
+    def test_extract_entities_returns_dates_and_people(self):
+        entities = extract_entities("Meet John", "Discuss budget with Sarah Connor tomorrow")
+        assert entities["dates"] == ["tomorrow"]
+        assert "Sarah Connor" in entities["people"]
+    
+    def test_chunked_scan_matches_whole_text(self, monkeypatch):
+        monkeypatch.setattr(entity_extraction, "ENTITY_CHUNK_CHARS", 100)
+        description = " ".join(["filler"] * 40 + ["meet Alice Smith on 2024-01-15"] * 3 + ["filler"] * 40)
+        entities = extract_entities("Plan", description, deadline=float("inf"))
+        assert entities == extract_entities("Plan", description)
+        assert "partial" not in entities
+    
+    def test_text_without_spaces_is_still_chunked(self, monkeypatch):
+        monkeypatch.setattr(entity_extraction, "ENTITY_CHUNK_CHARS", 100)
+        chunks = list(entity_extraction._chunks("x" * 250 + "\nmeet\tAlice"))
+        assert [stop for _, stop in chunks] == [100, 150, 11]
+        
+        entities = extract_entities("Plan", "QUJD" * 100, deadline=0)
+        assert entities["partial"] is True
+    
+    def test_expired_deadline_returns_partial_entities(self, monkeypatch):
+        monkeypatch.setattr(entity_extraction, "ENTITY_CHUNK_CHARS", 100)
+        entities = extract_entities("Plan", "meet Alice on 2024-01-15 " * 50, deadline=0)
+        assert entities == {"dates": [], "people": [], "partial": True}
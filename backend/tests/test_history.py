@@ -0,0 +1,187 @@
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+from app import history
+from app.history import HistoryCompactor, HistoryWriter, merge_entries
+
+class RecordingStorage:
+    def __init__(self, failures=0):
+        self.batches = []
+        self.failures = failures
+    
+    def add_history(self, entries):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("database unavailable")
+        self.batches.append(list(entries))
+
+def entries(count):
+    return [{"task_id": i, "action": "created", "changes": {}} for i in range(count)]
+
+@pytest.fixture
+def recording(monkeypatch):
+    def install(failures=0):
+        storage = RecordingStorage(failures)
+        monkeypatch.setattr(history, "get_storage", lambda: storage)
+        return storage
+    return install
+
+class TestHistoryWriter:
+    def test_full_batch_is_written_without_waiting_for_the_interval(self, recording):
+        storage = recording()
+        
+        async def scenario():
+            writer = HistoryWriter(batch_size=3, flush_interval=60)
+            writer.start()
+            await writer.enqueue(entries(3))
+            for _ in range(50):
+                if storage.batches:
+                    break
+                await asyncio.sleep(0.01)
+            await writer.stop()
+        
+        asyncio.run(scenario())
+        assert [len(batch) for batch in storage.batches] == [3]
+    
+    def test_partial_batch_is_written_after_the_interval(self, recording):
+        storage = recording()
+        
+        async def scenario():
+            writer = HistoryWriter(batch_size=100, flush_interval=0.01)
+            writer.start()
+            await writer.enqueue(entries(2))
+            await asyncio.sleep(0.1)
+            written = list(storage.batches)
+            await writer.stop()
+            return written
+        
+        assert [len(batch) for batch in asyncio.run(scenario())] == [2]
+    
+    def test_stop_flushes_queued_entries(self, recording):
+        storage = recording()
+        
+        async def scenario():
+            writer = HistoryWriter(batch_size=2, flush_interval=60)
+            writer.start()
+            await writer.enqueue(entries(1))
+            await writer.enqueue(entries(4))
+            await writer.stop()
+        
+        asyncio.run(scenario())
+        assert sum(len(batch) for batch in storage.batches) == 5
+        assert max(len(batch) for batch in storage.batches) == 2
+    
+    def test_failed_batches_are_retried(self, recording):
+        storage = recording(failures=2)
+        
+        async def scenario():
+            writer = HistoryWriter(max_retries=2, retry_delay=0)
+            await writer.enqueue(entries(3))
+        
+        asyncio.run(scenario())
+        assert [len(batch) for batch in storage.batches] == [3]
+    
+    def test_only_rows_that_keep_failing_are_dropped(self, recording):
+        storage = recording()
+        accept = storage.add_history
+        
+        def add_history(batch):
+            if any(entry["task_id"] == 3 for entry in batch):
+                raise RuntimeError("foreign key violation")
+            accept(batch)
+        storage.add_history = add_history
+        
+        asyncio.run(HistoryWriter(max_retries=1, retry_delay=0).enqueue(entries(8)))
+        written = sorted(entry["task_id"] for batch in storage.batches for entry in batch)
+        assert written == [0, 1, 2, 4, 5, 6, 7]
+    
+    def test_full_queue_applies_backpressure(self, recording):
+        storage = recording()
+        
+        async def scenario():
+            writer = HistoryWriter(batch_size=100, flush_interval=60, max_queue=2)
+            writer.start()
+            # Hold up the database: one batch waits to be written and the
+            # queue behind it fills.
+            async with writer._write_lock:
+                producer = asyncio.create_task(writer.enqueue(entries(5)))
+                await asyncio.sleep(0.01)
+                blocked = not producer.done()
+            await asyncio.wait_for(producer, timeout=1)
+            await writer.stop()
+            return blocked
+        
+        assert asyncio.run(scenario())
+        assert sum(len(batch) for batch in storage.batches) == 5
+    
+    def test_enqueue_larger_than_the_queue_is_drained_in_the_background(self, recording):
+        storage = recording()
+        
+        async def scenario():
+            writer = HistoryWriter(batch_size=100, flush_interval=60, max_queue=2)
+            writer.start()
+            await asyncio.wait_for(writer.enqueue(entries(5)), timeout=1)
+            await writer.stop()
+        
+        asyncio.run(scenario())
+        assert sum(len(batch) for batch in storage.batches) == 5
+
+
+def task_row(title):
+    return {"title": title, "description": title, "category": "general", "priority": "medium",
+            "status": "pending", "created_at": "2024-01-01T00:00:00", "updated_at": "2024-01-01T00:00:00"}
+
+def update(entry_id, task_id, created_at, **changes):
+    return {"id": entry_id, "task_id": task_id, "action": "updated", "changed_by": "system",
+            "changes": changes, "created_at": created_at}
+
+class TestHistoryCompaction:
+    def test_runs_merge_per_task_and_period(self):
+        snapshots, delete_ids = merge_entries([
+            update(1, 1, "2024-01-01T09:00:00", status="in_progress"),
+            update(2, 1, "2024-01-01T17:00:00", status="completed", priority="low"),
+            update(3, 1, "2024-01-02T09:00:00", status="pending"),
+            update(4, 2, "2024-01-02T10:00:00", title="A"),
+            update(5, 2, "2024-01-02T11:00:00+00:00", title="B"),
+        ], timedelta(days=1))
+        assert delete_ids == [1, 4]
+        assert [(s["id"], s["action"], s["changes"]) for s in snapshots] == [
+            (2, "snapshot", {"status": "completed", "priority": "low"}),
+            (5, "snapshot", {"title": "B"}),
+        ]
+    
+    def test_compaction_keeps_recent_and_created_entries(self, monkeypatch, storage):
+        monkeypatch.setattr(history, "get_storage", lambda: storage)
+        task = storage.create_task(task_row("A"))
+        storage.add_history(
+            [{"task_id": task["id"], "action": "created", "changes": {}, "created_at": "2024-01-01T00:00:00"}]
+            + [{"task_id": task["id"], "action": "updated", "changes": {"step": i},
+                "created_at": f"2024-01-0{1 + i // 3}T1{i}:00:00"} for i in range(6)]
+            + [{"task_id": task["id"], "action": "updated", "changes": {"step": 6}, "created_at": "2024-03-01T00:00:00"}]
+        )
+        
+        compactor = HistoryCompactor(retention=timedelta(days=30), period=timedelta(days=1))
+        assert compactor.compact(now=datetime(2024, 3, 2)) == 4
+        
+        entries = storage.list_history(task["id"], 10)
+        assert [(entry["action"], entry["changes"]) for entry in entries] == [
+            ("updated", {"step": 6}),
+            ("snapshot", {"step": 5}),
+            ("snapshot", {"step": 2}),
+            ("created", {}),
+        ]
+        assert compactor.compact(now=datetime(2024, 3, 2)) == 0
+    
+    def test_page_boundary_does_not_split_a_task(self, monkeypatch, storage):
+        monkeypatch.setattr(history, "get_storage", lambda: storage)
+        first, second = storage.create_tasks([task_row("A"), task_row("B")])
+        storage.add_history([
+            {"task_id": task["id"], "action": "updated", "changes": {"step": i},
+             "created_at": f"2024-01-01T1{i}:00:00"}
+            for task in (first, second) for i in range(2)
+        ])
+        
+        compactor = HistoryCompactor(retention=timedelta(days=1), batch_size=3)
+        assert compactor.compact(now=datetime(2024, 2, 1)) == 2
+        for task in (first, second):
+            assert [entry["action"] for entry in storage.list_history(task["id"], 10)] == ["snapshot"]
@@ -0,0 +1,92 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app import classification
+from app.analysis import analyze_tasks
+from app.learned_classifier import LearnedEngine, load_examples, save, train
+
+EXAMPLES = [
+    ("Fix login bug in the api server", "technical", "high", 1.0),
+    ("Deploy the database upgrade", "technical", "medium", 1.0),
+    ("Pay supplier invoice", "finance", "medium", 1.0),
+    ("Quarterly tax and payroll review", "finance", "low", 1.0),
+    ("Book meeting room for planning", "scheduling", "medium", 1.0),
+    ("Fire drill and safety inspection", "safety", "high", 1.0),
+    ("Water the office plants", "general", "low", 1.0),
+]
+
+@pytest.fixture
+def engine():
+    return LearnedEngine(train(EXAMPLES, bits=10))
+
+class TestLearnedEngine:
+    def test_batch_scores_match_single_scores(self, engine):
+        texts = ["Fix the api bug", "", "Pay the invoice", "Safety inspection of the fire exits"]
+        batch = engine.scores(texts)
+        for row, text in enumerate(texts):
+            assert np.allclose(batch[row], engine.scores([text])[0])
+    
+    def test_learns_categories_from_examples(self, engine):
+        assert [category for category, _ in engine.classify(["api server bug", "invoice to pay"])] == [
+            "technical", "finance"
+        ]
+    
+    def test_corrections_outweigh_other_examples(self):
+        examples = EXAMPLES + [("Office plants need water", "safety", "high", 20.0)]
+        engine = LearnedEngine(train(examples, bits=10))
+        assert engine.classify(["Water the plants"]) == [("safety", "high")]
+    
+    def test_saved_model_is_memory_mapped(self, engine, tmp_path):
+        path = str(tmp_path / "classifier.npy")
+        save(train(EXAMPLES, bits=10), path)
+        loaded = LearnedEngine.load(path)
+        assert isinstance(loaded.weights, np.memmap)
+        assert loaded.classify(["api server bug"]) == engine.classify(["api server bug"])
+    
+    def test_rejects_model_of_wrong_shape(self):
+        with pytest.raises(ValueError):
+            LearnedEngine(np.zeros((10, 3), dtype=np.float32))
+
+class TestEngineSelection:
+    def test_learned_engine_is_used_when_configured(self, monkeypatch, tmp_path):
+        path = str(tmp_path / "classifier.npy")
+        save(train(EXAMPLES, bits=10), path)
+        monkeypatch.setenv("CLASSIFIER_ENGINE", "learned")
+        monkeypatch.setenv("CLASSIFIER_MODEL_PATH", path)
+        monkeypatch.setattr(classification, "_engine", None)
+        
+        assert isinstance(classification.get_engine(), LearnedEngine)
+        result = classification.classify_task("Water", "the office plants")
+        assert (result["category"], result["priority"]) == ("general", "low")
+        assert result["suggested_actions"] == classification.SUGGESTED_ACTIONS["general"]
+    
+    def test_unknown_engine_is_rejected(self, monkeypatch):
+        monkeypatch.setenv("CLASSIFIER_ENGINE", "magic")
+        monkeypatch.setattr(classification, "_engine", None)
+        with pytest.raises(ValueError):
+            classification.get_engine()
+
+class TestTrainingData:
+    def test_hand_corrected_tasks_are_weighted_up(self, storage):
+        corrected, edited, untouched = storage.create_tasks([
+            {"title": title, "description": "d", "category": "general", "priority": "medium",
+             "status": "pending", "created_at": "2024-01-01T00:00:00", "updated_at": "2024-01-01T00:00:00"}
+            for title in ("A", "B", "C")
+        ])
+        storage.add_history([
+            {"task_id": corrected["id"], "action": "updated", "changes": {"category": "finance"},
+             "created_at": "2024-01-02T00:00:00"},
+            {"task_id": edited["id"], "action": "updated", "changes": {"title": "B2", "category": "finance"},
+             "created_at": "2024-01-02T00:00:00"},
+        ])
+        
+        weights = {text: weight for text, _, _, weight in load_examples(storage, correction_weight=4.0)}
+        assert weights == {"A d": 4.0, "B d": 1.0, "C d": 1.0}
+
+class TestBatchAnalysis:
+    def test_repeats_in_a_batch_are_analysed_once(self):
+        results = analyze_tasks([("Batch fix", "api bug"), ("Batch pay", "invoice"), ("Batch  fix", "api bug")])
+        assert [cached for _, cached in results] == [False, False, True]
+        assert results[0][0] == results[2][0]
+        assert results[0][0] is not results[2][0]
@@ -0,0 +1,46 @@
+import pytest
+from app.metrics import Counter, Histogram, db_duration, http_requests, stage_duration, startup_phase
+
+class TestMetricTypes:
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+        histogram.observe("/a", value=0.05)
+        histogram.observe("/a", value=0.5)
+        histogram.observe("/a", value=5)
+        lines = histogram.render()
+        
+        assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+        assert 'latency_seconds_bucket{route="/a",le="1.0"} 2' in lines
+        assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+        assert 'latency_seconds_count{route="/a"} 3' in lines
+    
+    def test_label_values_are_escaped(self):
+        counter = Counter("events_total", "Events.", ("name",))
+        counter.inc('say "hi"\n')
+        assert 'events_total{name="say \\"hi\\"\\n"} 1.0' in counter.render()
+
+class TestMetricsEndpoint:
+    def test_records_requests_by_route_template(self, client):
+        before = http_requests.value("GET", "/api/tasks/{task_id}", "404")
+        client.get("/api/tasks/999999")
+        assert http_requests.value("GET", "/api/tasks/{task_id}", "404") == before + 1
+    
+    def test_create_records_each_stage(self, client):
+        stages = stage_duration.count("classification")
+        inserts = db_duration.count("create_task")
+        client.post("/api/tasks", json={"title": "Metrics probe", "description": "Unique text for the stage timers"})
+        
+        assert stage_duration.count("classification") == stages + 1
+        assert db_duration.count("create_task") == inserts + 1
+        
+        body = client.get("/metrics").text
+        assert "# TYPE task_stage_duration_seconds histogram" in body
+        assert 'db_operation_duration_seconds_count{operation="create_task"}' in body
+        assert 'http_requests_total{method="POST",route="/api/tasks",status="201"}' in body
+    
+    def test_startup_phases_are_recorded(self, client):
+        client.get("/health")
+        body = client.get("/metrics").text
+        for phase in ("app_imported", "serving", "first_request"):
+            assert f'startup_phase_seconds{{phase="{phase}"}}' in body
+        assert startup_phase.value("app_imported") <= startup_phase.value("serving")
@@ -0,0 +1,220 @@
+import sqlite3
+import pytest
+from app.storage import SQLiteStorage
+
+def make_task(title, **overrides):
+    task = {
+        "title": title,
+        "description": f"{title} description",
+        "category": "general",
+        "priority": "medium",
+        "status": "pending",
+        "due_date": None,
+        "assigned_to": None,
+        "extracted_entities": {"dates": [], "people": []},
+        "suggested_actions": ["Follow up"],
+        "created_at": "2024-01-01T00:00:00",
+        "updated_at": "2024-01-01T00:00:00",
+    }
+    task.update(overrides)
+    return task
+
+class TestSQLiteStorage:
+    def test_create_and_get_round_trips_json_columns(self, storage):
+        created = storage.create_task(make_task("Write report"))
+        fetched = storage.get_task(created["id"])
+        assert fetched["title"] == "Write report"
+        assert fetched["extracted_entities"] == {"dates": [], "people": []}
+        assert fetched["suggested_actions"] == ["Follow up"]
+    
+    def test_create_tasks_preserves_input_order(self, storage):
+        created = storage.create_tasks([make_task("first"), make_task("second")])
+        assert [task["title"] for task in created] == ["first", "second"]
+    
+    def test_list_filters_searches_and_pages(self, storage):
+        storage.create_tasks([
+            make_task(f"Task {i}", status="done" if i % 2 else "pending",
+                      created_at=f"2024-01-{i + 1:02d}T00:00:00")
+            for i in range(5)
+        ])
+        
+        tasks, total = storage.list_tasks(offset=0, limit=2, status="pending")
+        assert total == 3
+        assert [task["title"] for task in tasks] == ["Task 4", "Task 2"]
+        
+        tasks, total = storage.list_tasks(offset=0, limit=10, search="TASK 3")
+        assert total == 1
+        assert tasks[0]["title"] == "Task 3"
+    
+    def test_search_escapes_like_wildcards(self, storage):
+        storage.create_tasks([make_task("100% done"), make_task("1000 done")])
+        tasks, total = storage.list_tasks(offset=0, limit=10, search="0%")
+        assert total == 1
+        assert tasks[0]["title"] == "100% done"
+    
+    def test_update_returns_none_for_missing_task(self, storage):
+        assert storage.update_task(999, {"status": "done"}) is None
+    
+    def test_update_writes_history_only_when_a_row_changed(self, storage):
+        task = storage.create_task(make_task("Review PR"))
+        history = {"action": "updated", "changed_by": "system", "changes": {"status": "done"}}
+        
+        updated = storage.update_task(task["id"], {"status": "done"}, {**history, "task_id": task["id"]})
+        assert updated["status"] == "done"
+        assert storage.update_task(999, {"status": "done"}, {**history, "task_id": 999}) is None
+        
+        with storage._connection() as conn:
+            rows = conn.execute("SELECT task_id, changes FROM task_history").fetchall()
+        assert [(row["task_id"], row["changes"]) for row in rows] == [(task["id"], '{"status": "done"}')]
+    
+    def test_delete_cascades_to_history(self, storage):
+        task = storage.create_task(make_task("Temporary"))
+        storage.add_history([{"task_id": task["id"], "action": "created", "changes": {}}])
+        storage.delete_task(task["id"])
+        
+        assert storage.get_task(task["id"]) is None
+        with storage._connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM task_history").fetchone()[0] == 0
+    
+    def test_update_tasks_by_filter_records_history_per_row(self, storage):
+        storage.create_tasks([
+            make_task("A", status="pending"), make_task("B", status="pending"), make_task("C", status="completed")
+        ])
+        history = {"action": "updated", "changed_by": "system", "changes": {"status": "archived"}}
+        
+        updated = storage.update_tasks({"status": "archived"}, history, status="pending")
+        assert sorted(task["title"] for task in updated) == ["A", "B"]
+        assert all(task["status"] == "archived" for task in updated)
+        with storage._connection() as conn:
+            task_ids = [row[0] for row in conn.execute("SELECT task_id FROM task_history ORDER BY task_id")]
+        assert task_ids == sorted(task["id"] for task in updated)
+    
+    def test_delete_tasks_by_ids_and_filter(self, storage):
+        a, b, c = storage.create_tasks([
+            make_task("A", category="finance"), make_task("B", category="finance"), make_task("C")
+        ])
+        assert storage.delete_tasks(ids=[a["id"], c["id"]], category="finance") == [a["id"]]
+        assert storage.delete_task(b["id"]) is True
+        assert storage.delete_task(b["id"]) is False
+        assert [task["id"] for task in storage.scan_tasks(10)] == [c["id"]]
+    
+    def test_due_at_column_is_added_and_backfilled(self, tmp_path):
+        path = str(tmp_path / "old.db")
+        conn = sqlite3.connect(path)
+        conn.executescript(
+            "CREATE TABLE tasks (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, "
+            "description TEXT NOT NULL, category TEXT, priority TEXT, status TEXT, due_date TEXT, "
+            "assigned_to TEXT, extracted_entities TEXT, suggested_actions TEXT, created_at TEXT, updated_at TEXT, "
+            "change_seq INTEGER);"
+            "INSERT INTO tasks (title, description, status, due_date) VALUES "
+            "('A', 'a', 'pending', '2030-01-02'), ('B', 'b', 'pending', 'next friday'), "
+            "('C', 'c', 'pending', '2024-13-45'), ('D', 'd', 'pending', '2030-02-30');"
+        )
+        conn.close()
+        
+        storage = SQLiteStorage(path)
+        assert storage.list_deadlines() == [(1, "2030-01-02T00:00:00")]
+        storage.close()
+    
+    def test_file_database_uses_wal(self, tmp_path):
+        storage = SQLiteStorage(str(tmp_path / "tasks.db"))
+        with storage._connection() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        storage.close()
+
+class TestSQLiteChanges:
+    def test_changes_follow_write_order_not_updated_at(self, storage):
+        a, b, c = storage.create_tasks([
+            make_task("A", updated_at="2024-01-03T00:00:00"),
+            make_task("B", updated_at="2024-01-01T00:00:00"),
+            make_task("C", updated_at="2024-01-02T00:00:00"),
+        ])
+        tasks, tombstones = storage.list_changes(2)
+        assert [task["title"] for task in tasks] == ["A", "B"]
+        assert tombstones == []
+        
+        storage.update_task(a["id"], {"status": "completed"})
+        last = tasks[-1]
+        tasks, _ = storage.list_changes(10, after=(last["change_xid"], last["change_seq"]))
+        assert [task["title"] for task in tasks] == ["C", "A"]
+    
+    def test_every_delete_leaves_a_tombstone(self, storage):
+        a, b, c = storage.create_tasks([make_task("A"), make_task("B", category="finance"), make_task("C")])
+        storage.delete_task(a["id"])
+        storage.delete_tasks(category="finance")
+        
+        tasks, tombstones = storage.list_changes(10)
+        assert [task["id"] for task in tasks] == [c["id"]]
+        assert [tombstone["id"] for tombstone in tombstones] == [a["id"], b["id"]]
+        
+        # Tasks and tombstones draw from the same counter.
+        seqs = [tasks[0]["change_seq"]] + [tombstone["change_seq"] for tombstone in tombstones]
+        assert len(set(seqs)) == 3
+        assert storage.list_changes(10, after=(max(seqs), max(seqs))) == ([], [])
+    
+    def test_write_between_the_two_reads_is_not_skipped(self, tmp_path):
+        path = str(tmp_path / "tasks.db")
+        storage = SQLiteStorage(path)
+        a, b = storage.create_tasks([make_task("A"), make_task("B")])
+        
+        def write_between_reads(statement):
+            if "FROM task_tombstones" in statement and not written:
+                written.append(True)
+                other = sqlite3.connect(path, isolation_level=None)
+                other.execute("UPDATE tasks SET status = 'completed' WHERE id = ?", (a["id"],))
+                other.execute("DELETE FROM tasks WHERE id = ?", (b["id"],))
+                other.close()
+        
+        written = []
+        with storage._connection() as conn:
+            conn.set_trace_callback(write_between_reads)
+        tasks, tombstones = storage.list_changes(10)
+        with storage._connection() as conn:
+            conn.set_trace_callback(None)
+        assert written
+        assert [task["title"] for task in tasks] == ["A", "B"]
+        assert tombstones == []
+        
+        last = tasks[-1]
+        tasks, tombstones = storage.list_changes(10, after=(last["change_xid"], last["change_seq"]))
+        assert [task["status"] for task in tasks] == ["completed"]
+        assert [tombstone["id"] for tombstone in tombstones] == [b["id"]]
+        storage.close()
+
+class TestSQLiteSearch:
+    def test_search_ranks_title_matches_first(self, storage):
+        storage.create_tasks([
+            make_task("Prepare slides", description="Budget review slides"),
+            make_task("Budget review", description="Quarterly numbers"),
+            make_task("Unrelated", description="Nothing here"),
+        ])
+        tasks, total = storage.search_tasks("budget", offset=0, limit=10)
+        assert total == 2
+        assert [task["title"] for task in tasks] == ["Budget review", "Prepare slides"]
+    
+    def test_index_follows_updates_and_deletes(self, storage):
+        task = storage.create_task(make_task("Renew passport", description="Before the trip"))
+        storage.update_task(task["id"], {"title": "Renew licence"})
+        assert storage.search_tasks("passport", 0, 10) == ([], 0)
+        assert storage.search_tasks("licence", 0, 10)[1] == 1
+        
+        storage.delete_task(task["id"])
+        assert storage.search_tasks("licence", 0, 10) == ([], 0)
+    
+    def test_query_syntax_is_treated_as_plain_terms(self, storage):
+        storage.create_task(make_task("Fix OR bug"))
+        tasks, total = storage.search_tasks('fix" OR (', 0, 10)
+        assert total == 1
+        assert storage.search_tasks("***", 0, 10) == ([], 0)
+    
+    def test_existing_rows_are_indexed_on_open(self, tmp_path):
+        path = str(tmp_path / "tasks.db")
+        storage = SQLiteStorage(path)
+        storage.create_task(make_task("Old task"))
+        with storage._connection() as conn:
+            conn.executescript("DROP TABLE tasks_fts;")
+        storage.close()
+        
+        storage = SQLiteStorage(path)
+        assert storage.search_tasks("old", 0, 10)[1] == 1
+        storage.close()
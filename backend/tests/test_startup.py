@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+import time
+from fastapi.testclient import TestClient
+from app.main import app
+from app.startup import PROCESS_STARTED_AT, parse_importtime, seconds_since_start
+
+class TestStartupTiming:
+    def test_process_start_is_in_the_past(self):
+        assert PROCESS_STARTED_AT <= time.time()
+        assert seconds_since_start() > 0
+    
+    def test_parses_importtime_report(self):
+        report = [
+            "import time: self [us] | cumulative | imported package",
+            "import time:       120 |        120 |   _io",
+            "import time:      3015 |      41250 | app.main",
+            "unrelated output",
+        ]
+        assert parse_importtime(report) == [("_io", 120, 120), ("app.main", 3015, 41250)]
+    
+    def test_app_import_leaves_heavy_modules_for_first_use(self):
+        lazy = ["supabase", "postgrest", "httpx", "dateutil.parser", "numpy"]
+        script = f"import sys, app.main; print([m for m in {lazy!r} if m in sys.modules])"
+        backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run(
+            [sys.executable, "-c", script], cwd=backend, capture_output=True, text=True, check=True
+        )
+        assert result.stdout.strip() == "[]"
+
+class TestHealth:
+    def test_health_is_unavailable_until_storage_initialises(self, monkeypatch):
+        monkeypatch.setenv("DB_BACKEND", "unknown")
+        with TestClient(app) as client:
+            assert client.get("/health").status_code == 503
+            
+            monkeypatch.setenv("DB_BACKEND", "sqlite")
+            monkeypatch.setenv("SQLITE_PATH", ":memory:")
+            response = client.get("/health")
+            assert response.status_code == 200
+            assert response.json() == {"status": "healthy"}
@@ -0,0 +1,410 @@
+import asyncio
+import base64
+import csv
+import io
+import json
+import pytest
+from datetime import datetime, timedelta
+from app import analysis
+from app.models import TaskResponse
+from app.history import history_writer
+from app.responses import task_payload
+
+def create(client, title, description, **fields):
+    response = client.post("/api/tasks", json={"title": title, "description": description, **fields})
+    assert response.status_code == 201
+    return response.json()
+
+class TestTasksApi:
+    def test_create_classifies_and_extracts(self, client):
+        task = create(client, "Pay invoice", "Urgent payment due 12/25/2024", assigned_to="Sam")
+        assert task["category"] == "finance"
+        assert task["priority"] == "high"
+        assert "2024-12-25" in task["extracted_entities"]["dates"]
+        assert "Sam" in task["extracted_entities"]["people"]
+    
+    def test_list_filters_and_paginates(self, client):
+        for i in range(3):
+            create(client, f"Fix bug {i}", "Debug the server")
+        create(client, "Team meeting", "Schedule the weekly meeting")
+        
+        response = client.get("/api/tasks", params={"category": "technical", "page_size": 2})
+        body = response.json()
+        assert body["total"] == 3
+        assert body["total_pages"] == 2
+        assert len(body["tasks"]) == 2
+        
+        response = client.get("/api/tasks", params={"search": "weekly"})
+        assert [task["title"] for task in response.json()["tasks"]] == ["Team meeting"]
+    
+    def test_update_and_delete(self, client):
+        task = create(client, "Write docs", "Document the API")
+        
+        response = client.patch(f"/api/tasks/{task['id']}", json={"status": "completed"})
+        assert response.status_code == 200
+        assert response.json()["status"] == "completed"
+        
+        assert client.delete(f"/api/tasks/{task['id']}").status_code == 204
+        assert client.get(f"/api/tasks/{task['id']}").status_code == 404
+    
+    def test_missing_task_returns_404(self, client):
+        assert client.patch("/api/tasks/999", json={"status": "done"}).status_code == 404
+        assert client.delete("/api/tasks/999").status_code == 404
+    
+    def test_bulk_create_reports_each_item(self, client):
+        response = client.post("/api/tasks/bulk", json=[
+            {"title": "Pay invoice", "description": "Process the billing"},
+            {"title": "Fix bug", "description": "Deploy the fix"},
+        ])
+        assert response.status_code == 201
+        body = response.json()
+        assert body["created"] == 2
+        assert body["failed"] == 0
+        assert [item["task"]["category"] for item in body["results"]] == ["finance", "technical"]
+    
+    def test_bulk_create_classifies_in_one_batch_off_the_loop(self, client, monkeypatch):
+        calls = []
+        real_analyze_tasks = analysis.analyze_tasks
+        
+        def recording_analyze_tasks(tasks):
+            try:
+                asyncio.get_running_loop()
+                on_loop = True
+            except RuntimeError:
+                on_loop = False
+            calls.append((len(tasks), on_loop))
+            return real_analyze_tasks(tasks)
+        monkeypatch.setattr(analysis, "analyze_tasks", recording_analyze_tasks)
+        
+        response = client.post("/api/tasks/bulk", json=[
+            {"title": f"Batch item {i}", "description": "Send the invoice", "assigned_to": "Dana"}
+            for i in range(5)
+        ])
+        assert response.json()["created"] == 5
+        assert response.json()["results"][0]["task"]["extracted_entities"]["people"] == ["Dana"]
+        assert calls == [(5, False)]
+
+class TestUpdateTask:
+    def test_text_change_reclassifies(self, client):
+        task = create(client, "Team lunch", "Pick a place")
+        assert task["category"] == "general"
+        
+        response = client.patch(f"/api/tasks/{task['id']}", json={"title": "Pay invoice", "description": "Urgent, due 3/1/2030"})
+        updated = response.json()
+        assert updated["category"] == "finance"
+        assert updated["priority"] == "high"
+        assert "2030-03-01" in updated["extracted_entities"]["dates"]
+    
+    def test_explicit_category_wins_over_reclassification(self, client):
+        task = create(client, "Team lunch", "Pick a place")
+        response = client.patch(f"/api/tasks/{task['id']}", json={"title": "Pay invoice", "category": "general"})
+        assert response.json()["category"] == "general"
+    
+    def test_unchanged_text_is_not_reclassified(self, client):
+        task = create(client, "Team lunch", "Pick a place")
+        client.patch(f"/api/tasks/{task['id']}", json={"category": "finance"})
+        
+        response = client.patch(f"/api/tasks/{task['id']}", json={"title": "Team lunch"})
+        assert response.json()["category"] == "finance"
+    
+    def test_missing_task_returns_404(self, client):
+        assert client.patch("/api/tasks/999999", json={"status": "completed"}).status_code == 404
+        assert client.patch("/api/tasks/999999", json={"title": "New"}).status_code == 404
+
+class TestBulkMutations:
+    def test_bulk_update_applies_to_matching_tasks(self, client):
+        bug = create(client, "Fix bug", "Debug the server")
+        other = create(client, "Fix crash", "Debug the app")
+        lunch = create(client, "Team lunch", "Pick a place")
+        client.get("/api/tasks", params={"status": "completed"})
+        
+        response = client.patch("/api/tasks/bulk", json={
+            "filter": {"category": "technical", "ids": [bug["id"], lunch["id"]]},
+            "changes": {"status": "completed", "assigned_to": "Sam"},
+        })
+        assert response.status_code == 200
+        assert response.json() == {"affected": 1, "ids": [bug["id"]]}
+        assert client.get(f"/api/tasks/{bug['id']}").json()["status"] == "completed"
+        assert client.get(f"/api/tasks/{other['id']}").json()["status"] == "pending"
+        completed = client.get("/api/tasks", params={"status": "completed"}).json()
+        assert [task["id"] for task in completed["tasks"]] == [bug["id"]]
+    
+    def test_bulk_delete_by_filter(self, client):
+        create(client, "Fix bug", "Debug the server")
+        lunch = create(client, "Team lunch", "Pick a place")
+        
+        response = client.delete("/api/tasks", params={"category": "technical"})
+        assert response.json()["affected"] == 1
+        assert [task["id"] for task in client.get("/api/tasks").json()["tasks"]] == [lunch["id"]]
+    
+    def test_bulk_mutations_require_a_filter(self, client):
+        assert client.delete("/api/tasks").status_code == 400
+        response = client.patch("/api/tasks/bulk", json={"filter": {}, "changes": {"status": "completed"}})
+        assert response.status_code == 400
+    
+    def test_delete_missing_task_returns_404(self, client):
+        assert client.delete("/api/tasks/999999").status_code == 404
+
+class TestStatsApi:
+    def test_counts_each_dimension_and_due_dates(self, client):
+        today = datetime.utcnow().date()
+        create(client, "Fix bug", "Debug the server", due_date=(today - timedelta(days=2)).isoformat())
+        create(client, "Fix crash", "Debug the app", due_date=(today + timedelta(days=3)).isoformat())
+        done = create(client, "Pay invoice", "Billing", due_date=(today - timedelta(days=1)).isoformat())
+        create(client, "Team lunch", "Pick a place", due_date=(today + timedelta(days=30)).isoformat())
+        client.patch(f"/api/tasks/{done['id']}", json={"status": "completed"})
+        
+        stats = client.get("/api/tasks/stats").json()
+        assert stats["total"] == 4
+        assert stats["by_category"] == {"technical": 2, "finance": 1, "general": 1}
+        assert stats["by_status"] == {"pending": 3, "completed": 1}
+        assert sum(stats["by_priority"].values()) == 4
+        assert stats["overdue"] == 1
+        assert stats["due_soon"] == 1
+        
+        assert client.get("/api/tasks/stats", params={"due_soon_days": 60}).json()["due_soon"] == 2
+    
+    def test_counts_follow_writes(self, client):
+        assert client.get("/api/tasks/stats").json()["total"] == 0
+        task = create(client, "Write docs", "Document the API")
+        assert client.get("/api/tasks/stats").json()["total"] == 1
+        client.delete(f"/api/tasks/{task['id']}")
+        assert client.get("/api/tasks/stats").json()["total"] == 0
+
+class TestDueApi:
+    def test_due_at_comes_from_due_date_or_text(self, client):
+        explicit = create(client, "Renew domain", "Before it lapses", due_date="2031-01-02")
+        inferred = create(client, "Pay invoice", "Due 3/4/2031")
+        assert explicit["due_at"] == "2031-01-02T00:00:00"
+        assert inferred["due_at"] == "2031-03-04T00:00:00"
+        
+        updated = client.patch(f"/api/tasks/{inferred['id']}", json={"due_date": "2031-05-06"}).json()
+        assert updated["due_at"] == "2031-05-06T00:00:00"
+    
+    def test_lists_unfinished_tasks_due_within_window(self, client):
+        now = datetime.utcnow()
+        soon = create(client, "Ship release", "Cut the tag", due_date=(now + timedelta(hours=3)).isoformat())
+        later = create(client, "Plan offsite", "Book venue", due_date=(now + timedelta(days=3)).isoformat())
+        late = create(client, "File report", "Quarterly", due_date=(now - timedelta(hours=3)).isoformat())
+        done = create(client, "Fix bug", "Server", due_date=(now + timedelta(hours=1)).isoformat())
+        client.patch(f"/api/tasks/{done['id']}", json={"status": "completed"})
+        
+        due = client.get("/api/tasks/due", params={"within": "24h"}).json()
+        assert [task["id"] for task in due] == [soon["id"]]
+        
+        due = client.get("/api/tasks/due", params={"within": "7d", "include_overdue": True}).json()
+        assert [task["id"] for task in due] == [late["id"], soon["id"], later["id"]]
+    
+    def test_invalid_window_is_rejected(self, client):
+        assert client.get("/api/tasks/due", params={"within": "soon"}).status_code == 400
+        assert client.get("/api/tasks/due", params={"within": "99999999999d"}).status_code == 400
+        assert client.get("/api/tasks/due", params={"within": "3000000d"}).status_code == 400
+
+class TestTaskCache:
+    def test_repeated_reads_hit_the_cache(self, client):
+        task = create(client, "Cached", "Read me twice")
+        client.get(f"/api/tasks/{task['id']}")
+        client.get(f"/api/tasks/{task['id']}")
+        client.get("/api/tasks", params={"status": "pending"})
+        client.get("/api/tasks", params={"status": "pending"})
+        
+        stats = client.get("/cache/stats").json()
+        assert stats["enabled"]
+        assert stats["hits"] == 2
+        assert stats["misses"] == 2
+    
+    def test_writes_invalidate_affected_lists(self, client):
+        task = create(client, "First", "Something to do")
+        assert client.get("/api/tasks", params={"status": "pending"}).json()["total"] == 1
+        
+        create(client, "Second", "Something else")
+        assert client.get("/api/tasks", params={"status": "pending"}).json()["total"] == 2
+        
+        client.patch(f"/api/tasks/{task['id']}", json={"status": "completed"})
+        assert client.get("/api/tasks", params={"status": "pending"}).json()["total"] == 1
+        assert client.get("/api/tasks", params={"status": "completed"}).json()["total"] == 1
+        assert client.get(f"/api/tasks/{task['id']}").json()["status"] == "completed"
+        
+        client.delete(f"/api/tasks/{task['id']}")
+        assert client.get("/api/tasks", params={"status": "completed"}).json()["total"] == 0
+        assert client.get(f"/api/tasks/{task['id']}").status_code == 404
+
+class TestCursorPagination:
+    def test_cursor_walks_every_task_once(self, client):
+        for i in range(5):
+            create(client, f"Task {i}", "Something to do")
+        
+        seen = []
+        body = client.get("/api/tasks", params={"page_size": 2}).json()
+        seen.extend(task["title"] for task in body["tasks"])
+        while body["next_cursor"]:
+            # A task created mid-scroll must not shift the following pages.
+            create(client, "Late arrival", "Created while scrolling")
+            body = client.get("/api/tasks", params={"page_size": 2, "cursor": body["next_cursor"]}).json()
+            seen.extend(task["title"] for task in body["tasks"])
+        
+        assert seen == [f"Task {i}" for i in reversed(range(5))]
+    
+    def test_invalid_cursor_is_rejected(self, client):
+        assert client.get("/api/tasks", params={"cursor": "not-a-cursor"}).status_code == 400
+    
+    def test_cursor_with_filter_syntax_is_rejected(self, client):
+        for value in (['2024-01-01",id.gt.0),or(id.gte.0', 1], ["2024-01-01T00:00:00", "1,id.gt.0"]):
+            cursor = base64.urlsafe_b64encode(json.dumps(value).encode()).decode()
+            assert client.get("/api/tasks", params={"cursor": cursor}).status_code == 400
+
+class TestSearchApi:
+    def test_search_endpoint_pages_ranked_results(self, client):
+        create(client, "Budget review", "Quarterly numbers")
+        create(client, "Slides", "Prepare the budget slides")
+        create(client, "Unrelated", "Nothing to see")
+        
+        body = client.get("/api/tasks/search", params={"q": "budget", "page_size": 1}).json()
+        assert body["total"] == 2
+        assert body["total_pages"] == 2
+        assert body["tasks"][0]["title"] == "Budget review"
+    
+    def test_search_requires_a_query(self, client):
+        assert client.get("/api/tasks/search").status_code == 422
+
+class TestExportApi:
+    def test_ndjson_export_streams_every_matching_task(self, client, monkeypatch):
+        from app.routers import tasks as tasks_router
+        monkeypatch.setattr(tasks_router, "EXPORT_CHUNK_SIZE", 2)
+        for i in range(5):
+            create(client, f"Fix bug {i}", "Debug the server")
+        create(client, "Team meeting", "Schedule the weekly meeting")
+        
+        response = client.get("/api/tasks/export", params={"category": "technical"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["title"] for row in rows] == [f"Fix bug {i}" for i in reversed(range(5))]
+        assert rows[0]["extracted_entities"] == {"dates": [], "people": []}
+    
+    def test_csv_export_has_header_and_rows(self, client):
+        create(client, "Pay invoice", "Billing, due soon")
+        
+        response = client.get("/api/tasks/export", params={"format": "csv"})
+        rows = list(csv.reader(io.StringIO(response.text)))
+        assert rows[0][:3] == ["id", "title", "description"]
+        assert rows[1][1:3] == ["Pay invoice", "Billing, due soon"]
+    
+    def test_unknown_format_is_rejected(self, client):
+        assert client.get("/api/tasks/export", params={"format": "xml"}).status_code == 422
+
+class TestFastResponses:
+    def test_list_rows_match_the_response_model(self, client):
+        created = create(client, "Pay invoice", "Urgent payment due 12/25/2024 with Sarah")
+        body = client.get("/api/tasks").json()
+        assert body["tasks"] == [TaskResponse(**created).model_dump()]
+        assert body["next_cursor"] is None
+        assert client.get(f"/api/tasks/{created['id']}").json() == created
+    
+    def test_payload_fills_defaults_and_drops_extra_columns(self):
+        row = {field: None for field in TaskResponse.model_fields}
+        row["rank"] = 1.5
+        payload = task_payload(row)
+        assert "rank" not in payload
+        assert payload["extracted_entities"] == {}
+        assert payload["suggested_actions"] == []
+    
+    def test_openapi_still_documents_response_models(self, client):
+        schema = client.get("/openapi.json").json()
+        list_schema = schema["paths"]["/api/tasks"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+        assert list_schema["$ref"].endswith("/TaskListResponse")
+
+class TestConditionalGet:
+    def test_unchanged_list_returns_304(self, client):
+        create(client, "Fix bug", "Debug the server")
+        first = client.get("/api/tasks")
+        etag = first.headers["ETag"]
+        
+        second = client.get("/api/tasks", headers={"If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.headers["ETag"] == etag
+        assert second.content == b""
+        
+        create(client, "Team meeting", "Schedule the weekly meeting")
+        third = client.get("/api/tasks", headers={"If-None-Match": etag})
+        assert third.status_code == 200
+        assert third.headers["ETag"] != etag
+    
+    def test_single_task_etag_follows_updates(self, client):
+        task = create(client, "Fix bug", "Debug the server")
+        etag = client.get(f"/api/tasks/{task['id']}").headers["ETag"]
+        assert client.get(f"/api/tasks/{task['id']}", headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+        
+        client.patch(f"/api/tasks/{task['id']}", json={"status": "completed"})
+        response = client.get(f"/api/tasks/{task['id']}", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["status"] == "completed"
+
+class TestChangesApi:
+    def test_feed_returns_updates_and_tombstones_since_cursor(self, client):
+        first = create(client, "Fix bug", "Debug the server")
+        second = create(client, "Team meeting", "Schedule the weekly meeting")
+        
+        body = client.get("/api/tasks/changes").json()
+        assert [task["id"] for task in body["tasks"]] == [first["id"], second["id"]]
+        assert body["deleted"] == []
+        assert body["has_more"] is False
+        since = body["next_since"]
+        
+        idle = client.get("/api/tasks/changes", params={"since": since}).json()
+        assert idle == {"tasks": [], "deleted": [], "next_since": since, "has_more": False}
+        
+        client.patch(f"/api/tasks/{second['id']}", json={"status": "completed"})
+        client.delete(f"/api/tasks/{first['id']}")
+        body = client.get("/api/tasks/changes", params={"since": since}).json()
+        assert [task["status"] for task in body["tasks"]] == ["completed"]
+        assert [tombstone["id"] for tombstone in body["deleted"]] == [first["id"]]
+    
+    def test_feed_pages_with_has_more(self, client):
+        for i in range(3):
+            create(client, f"Task {i}", "Something to do")
+        
+        seen = []
+        body = client.get("/api/tasks/changes", params={"limit": 2}).json()
+        seen.extend(task["title"] for task in body["tasks"])
+        assert body["has_more"] is True
+        body = client.get("/api/tasks/changes", params={"limit": 2, "since": body["next_since"]}).json()
+        seen.extend(task["title"] for task in body["tasks"])
+        assert body["has_more"] is False
+        assert seen == ["Task 0", "Task 1", "Task 2"]
+    
+    def test_invalid_since_is_rejected(self, client):
+        assert client.get("/api/tasks/changes", params={"since": "nope"}).status_code == 400
+
+class TestHistoryApi:
+    def test_history_pages_newest_first(self, client):
+        task = create(client, "Fix bug", "Debug the server")
+        for status in ("in_progress", "completed"):
+            client.patch(f"/api/tasks/{task['id']}", json={"status": status})
+        client.portal.call(history_writer.flush)
+        
+        body = client.get(f"/api/tasks/{task['id']}/history", params={"limit": 2}).json()
+        assert [entry["changes"].get("status") for entry in body["entries"]] == ["completed", "in_progress"]
+        assert body["next_cursor"]
+        
+        body = client.get(f"/api/tasks/{task['id']}/history", params={"cursor": body["next_cursor"]}).json()
+        assert [entry["action"] for entry in body["entries"]] == ["created"]
+        assert body["next_cursor"] is None
+    
+    def test_history_read_does_not_flush_the_write_behind_queue(self, client, monkeypatch):
+        task = create(client, "Fix bug", "Debug the server")
+        
+        flushes = []
+        flush = history_writer.flush
+        
+        async def recording_flush():
+            flushes.append(True)
+            await flush()
+        
+        monkeypatch.setattr(history_writer, "flush", recording_flush)
+        assert client.get(f"/api/tasks/{task['id']}/history").status_code == 200
+        assert flushes == []
+    
+    def test_history_of_missing_task_returns_404(self, client):
+        assert client.get("/api/tasks/999/history").status_code == 404
+        assert client.get("/api/tasks/1/history", params={"cursor": "x"}).status_code == 400